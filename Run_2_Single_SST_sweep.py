@@ -11,105 +11,119 @@ from aesim.simba import Design, JsonProjectRepository
 import os, pathlib
 import numpy as np
 import math
+from simba_timestep import apply_fast_mode
+from simba_sweep import run_sweep
+from simba_tune import tune_gain
+from simba_overrides import DesignTemplate
+from simba_kpi import stack_runs, step_kpis, peak_current, print_kpis
 
-#%%  Open Design
-filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
-print("loading file: "+filepath)
-project = JsonProjectRepository(filepath) # Open file
-sst_model = project.GetDesignByName("2 Single SST")
-print("loading model: "+sst_model.Name)
+# Workers are spawned processes that re-import this script, only the parent runs the model
+if __name__ == "__main__":
+    #%%  Open Design
+    filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
+    print("loading file: "+filepath)
+    project = JsonProjectRepository(filepath) # Open file
+    sst_model = project.GetDesignByName("2 Single SST")
+    print("loading model: "+sst_model.Name)
+    apply_fast_mode(filepath, sst_model)  # SIMBA_FAST=1: recommended TimeStep of simba_timestep
 
-#%%  List of all variables
-variables = sst_model.Circuit.Variables
-print("loading variables: ")
-for variable in variables:
-    print("Name: " + variable.Name + "\t Value: " + variable.Value)
+    #%%  List of all variables
+    variables = sst_model.Circuit.Variables
+    print("loading variables: ")
+    for variable in variables:
+        print("Name: " + variable.Name + "\t Value: " + variable.Value)
 
-#%%  Run Simulation
-job = sst_model.TransientAnalysis.NewJob()
-print("-> Job Started ")
-status = job.Run()
+    #%%  Run Simulation
+    job = sst_model.TransientAnalysis.NewJob()
+    print("-> Job Started ")
+    status = job.Run()
 
-#%% Get results
-t = job.TimePoints
-Vprim = np.array(job.GetSignalByName('Sc1:Sc1:V_PRIM - Instantaneous Voltage').DataPoints)
-Isec = np.array(job.GetSignalByName('Sc1:Sc1:I_SEC - Instantaneous Current').DataPoints)
-Vsec = np.array(job.GetSignalByName('Sc1:Sc1:V_SEC - Instantaneous Voltage').DataPoints)
-Iprim = np.array(job.GetSignalByName('Sc1:Sc1:I_PRIM - Instantaneous Current').DataPoints)
-Isrc = np.array(job.GetSignalByName('Sc1:Sc1:I_SRC - Instantaneous Current').DataPoints)
-Iload = np.array(job.GetSignalByName('Sc1:Sc1:I_LOAD - Instantaneous Current').DataPoints)
+    #%% Get results
+    t = job.TimePoints
+    Vprim = np.array(job.GetSignalByName('Sc1:Sc1:V_PRIM - Instantaneous Voltage').DataPoints)
+    Isec = np.array(job.GetSignalByName('Sc1:Sc1:I_SEC - Instantaneous Current').DataPoints)
+    Vsec = np.array(job.GetSignalByName('Sc1:Sc1:V_SEC - Instantaneous Voltage').DataPoints)
+    Iprim = np.array(job.GetSignalByName('Sc1:Sc1:I_PRIM - Instantaneous Current').DataPoints)
+    Isrc = np.array(job.GetSignalByName('Sc1:Sc1:I_SRC - Instantaneous Current').DataPoints)
+    Iload = np.array(job.GetSignalByName('Sc1:Sc1:I_LOAD - Instantaneous Current').DataPoints)
 
-#%% Plot Curve
-fig1, (ax1,ax2) = plt.subplots(2, 1, sharex=True)
-ax1.set_title('Single DAB SST voltage controlled - Load Step Response')
-ax1.plot(t, Vprim, label='V_prim')
-ax1.plot(t, Vsec, label='V_sec')
-ax1.set_ylim(0, 2500)
-ax1.set_ylabel('Voltages [V]')
-ax1.grid(True)
-ax1.legend(loc='lower left',fancybox=True, shadow=True, ncol=2)
-ax2.plot(t, -Iload, label='I_load')
-ax2.plot(t, -Iprim, label='I_prim')
-ax2.plot(t, -Isec, label='I_sec')
-ax2.set_ylim(-1000, 1000)
-ax2.set_xlim(0, 0.1)
-ax2.set_ylabel('Currents [V]')
-ax2.set_xlabel('time [s]')
-ax2.grid(True)
-ax2.legend(loc='lower left',fancybox=True, shadow=True, ncol=4)
+    #%% Plot Curve
+    fig1, (ax1,ax2) = plt.subplots(2, 1, sharex=True)
+    ax1.set_title('Single DAB SST voltage controlled - Load Step Response')
+    ax1.plot(t, Vprim, label='V_prim')
+    ax1.plot(t, Vsec, label='V_sec')
+    ax1.set_ylim(0, 2500)
+    ax1.set_ylabel('Voltages [V]')
+    ax1.grid(True)
+    ax1.legend(loc='lower left',fancybox=True, shadow=True, ncol=2)
+    ax2.plot(t, -Iload, label='I_load')
+    ax2.plot(t, -Iprim, label='I_prim')
+    ax2.plot(t, -Isec, label='I_sec')
+    ax2.set_ylim(-1000, 1000)
+    ax2.set_xlim(0, 0.1)
+    ax2.set_ylabel('Currents [V]')
+    ax2.set_xlabel('time [s]')
+    ax2.grid(True)
+    ax2.legend(loc='lower left',fancybox=True, shadow=True, ncol=4)
 
-#%% Sweep Ki values KI_V = 500 -> 5000
-print("-> Job Done")
-print("-> Sweep PI parameter KI_V : 500 -> 5000")
-i_limit=400
-I_SST_LIMIT = next(variable for variable in variables if variable.Name == "I_SST_LIMIT")
-I_SST_LIMIT.Value=str(i_limit)
-print("Name: I_SST_LIMI" + "\t Value: " + str(i_limit))
+    #%% Sweep Ki values KI_V = 500 -> 5000
+    print("-> Job Done")
+    print("-> Sweep PI parameter KI_V : 500 -> 5000")
+    i_limit=400
+    # Overrides are checked against the design variables, the design itself stays untouched
+    template = DesignTemplate(filepath, sst_model.Name)
+    fixed_values = template.validate({"I_SST_LIMIT": i_limit})
+    print("Name: I_SST_LIMIT" + "\t Value: " + str(fixed_values["I_SST_LIMIT"]))
 
-ki_values = np.array([5000,2000,1000,500])
+    ki_values = np.array([5000,2000,1000,500])
 
-t_arr    = []
-Vprim_arr = []
-Vsec_arr = []
-Iprim_arr = []
-Isec_arr = []
+    #%% Iterate over a pool of worker processes
+    signal_names = ['Sc1:Sc1:V_PRIM - Instantaneous Voltage',
+                    'Sc1:Sc1:I_SEC - Instantaneous Current',
+                    'Sc1:Sc1:V_SEC - Instantaneous Voltage',
+                    'Sc1:Sc1:I_PRIM - Instantaneous Current']
+    t_arr, signal_arr = run_sweep(filepath, sst_model.Name, "KI_V", ki_values, signal_names, fixed_values,
+                                  cache_dir=os.path.join(pathlib.Path().absolute(), ".simba_cache"))
+    Vprim_arr = signal_arr['Sc1:Sc1:V_PRIM - Instantaneous Voltage']
+    Isec_arr = signal_arr['Sc1:Sc1:I_SEC - Instantaneous Current']
+    Vsec_arr = signal_arr['Sc1:Sc1:V_SEC - Instantaneous Voltage']
+    Iprim_arr = signal_arr['Sc1:Sc1:I_PRIM - Instantaneous Current']
 
-#%% Iterate
-for ki in ki_values:
-    KI_V = next(variable for variable in variables if variable.Name == "KI_V")
-    KI_V.Value=str(ki)
-    print("Name: KI_V" + "\t Value: " + str(ki))
-    
-    # Run calculation
-    job = sst_model.TransientAnalysis.NewJob()
-    print("-> Job Started ")
-    status = job.Run()
+    #%% Step response KPIs of all sweep points (load step at 0.05 s)
+    t_kpi, Isec_runs = stack_runs(t_arr, Isec_arr)
+    kpis = step_kpis(t_kpi, -Isec_runs, 0.05, 0.09, f_sw=10e3)
+    t_kpi, Vsec_runs = stack_runs(t_arr, Vsec_arr)
+    kpis["v_sec_error"] = step_kpis(t_kpi, Vsec_runs, 0.05, 0.09, setpoint=2000)["steady_state_error"]
+    kpis["peak_current"], kpis["peak_to_limit"] = peak_current(t_kpi, Isec_runs, i_limit, 0.01)
+    print_kpis(["ki = " + str(ki) for ki in ki_values], kpis)
 
-    #%% Get results
-    t_arr.append(np.asarray(job.TimePoints))
-    Vprim_arr.append(np.asarray(job.GetSignalByName('Sc1:Sc1:V_PRIM - Instantaneous Voltage').DataPoints))
-    Isec_arr.append(np.asarray(job.GetSignalByName('Sc1:Sc1:I_SEC - Instantaneous Current').DataPoints))
-    Vsec_arr.append(np.asarray(job.GetSignalByName('Sc1:Sc1:V_SEC - Instantaneous Voltage').DataPoints))
-    Iprim_arr.append(np.asarray(job.GetSignalByName('Sc1:Sc1:I_PRIM - Instantaneous Current').DataPoints))
+    #%% Plot Curve
+    fig2, (ax1,ax2) = plt.subplots(2, 1, sharex=True)
+    ax1.set_title('Single DAB SST voltage controlled - Ki parameter sweep')
+    for i in range(len(Vsec_arr)):
+        ax1.plot(np.asarray(t_arr[i]), np.asarray(Vsec_arr[i]), label='Vsec, ki = '+str(ki_values[i]))
+    ax1.set_ylim(0, 2500)
+    ax1.set_ylabel('Voltages [V]')
+    ax1.grid(True)
+    ax1.legend(loc='lower left')
+    for i in range(len(Iprim_arr)):
+        ax2.plot(np.asarray(t_arr[i]), -np.asarray(Isec_arr[i]), label='I_sec, ki = '+str(ki_values[i]))
+    ax2.set_ylim(-500, 500)
+    ax2.set_xlim(0.025, 0.075)
+    ax2.set_ylabel('Currents [V]')
+    ax2.set_xlabel('time [s]')
+    ax2.grid(True)
+    ax2.legend(loc='lower left')
 
-#%% Plot Curve
-fig2, (ax1,ax2) = plt.subplots(2, 1, sharex=True)
-ax1.set_title('Single DAB SST voltage controlled - Ki parameter sweep')
-for i in range(len(Vsec_arr)):
-    ax1.plot(np.asarray(t_arr[i]), np.asarray(Vsec_arr[i]), label='Vsec, ki = '+str(ki_values[i]))
-ax1.set_ylim(0, 2500)
-ax1.set_ylabel('Voltages [V]')
-ax1.grid(True)
-ax1.legend(loc='lower left')
-for i in range(len(Iprim_arr)):
-    ax2.plot(np.asarray(t_arr[i]), -np.asarray(Isec_arr[i]), label='I_sec, ki = '+str(ki_values[i]))
-ax2.set_ylim(-500, 500)
-ax2.set_xlim(0.025, 0.075)
-ax2.set_ylabel('Currents [V]')
-ax2.set_xlabel('time [s]')
-ax2.grid(True)
-ax2.legend(loc='lower left')
+    #%% Optional: search the KI_V edge of the spec instead of reading it off the grid (SIMBA_TUNE=1)
+    # V_sec settled within 5 ms of the load step, same workers and cache as the sweep, see simba_tune
+    if os.environ.get("SIMBA_TUNE") == "1":
+        spec = {"step_time": 0.05, "end_time": 0.09, "max_settling_time": 0.005}
+        ki_tuned, history = tune_gain(filepath, sst_model.Name, "KI_V", (100, 20000),
+                                      'Sc1:Sc1:V_SEC - Instantaneous Voltage', spec, fixed_values,
+                                      cache_dir=os.path.join(pathlib.Path().absolute(), ".simba_cache"))
+        print("-> Tuned KI_V = " + str(ki_tuned) + " in " + str(len(history)) + " runs")
 
-print("-> Job Done ")
-plt.show()
+    print("-> Job Done ")
+    plt.show()
 # %%
@@ -11,6 +11,7 @@ from aesim.simba import Design, JsonProjectRepository
 import os, pathlib
 import numpy as np
 import math
+from simba_timestep import apply_fast_mode
 
 #%%  Open Design
 filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
@@ -18,6 +19,7 @@ print("loading model: "+filepath)
 project = JsonProjectRepository(filepath) # Open file
 sst_model = project.GetDesignByName("3 Single SST with BESS and AFE")
 print("loading model: "+sst_model.Name)
+apply_fast_mode(filepath, sst_model)  # SIMBA_FAST=1: recommended TimeStep of simba_timestep
 
 #%%  List of all variables
 variables = sst_model.Circuit.Variables
@@ -11,6 +11,10 @@ from aesim.simba import Design, JsonProjectRepository
 import os, pathlib
 import numpy as np
 import math
+from simba_timestep import apply_fast_mode
+from simba_cache import ResultCache
+from simba_sweep import run_design
+from simba_stream import run_streaming, decimate_minmax
 
 #%%  Open Design
 filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
@@ -18,6 +22,7 @@ print("loading model: "+filepath)
 project = JsonProjectRepository(filepath) # Open file
 sst_model = project.GetDesignByName("6 DCMicrogrid")
 print("loading model: "+sst_model.Name)
+apply_fast_mode(filepath, sst_model)  # SIMBA_FAST=1: recommended TimeStep of simba_timestep
 
 #%%  List of all variables
 variables = sst_model.Circuit.Variables
@@ -25,44 +30,91 @@ for variable in variables:
     print("Name:" + variable.Name + "\t Value:" + variable.Value)
 
 #%%  Run Simulation
-job = sst_model.TransientAnalysis.NewJob()
-print("-> Job Started ")
-status = job.Run()
+# streaming: advance the 16 s job in windows written to disk, memory is bounded by the window
+# and by the plot resolution below
+# otherwise: single run, results are reused from the cache when design and settings are unchanged
+streaming = True
+signal_names = ['Sc6:V_AFE - Instantaneous Voltage',
+                'Sc6:I_AFE - Instantaneous Current',
+                'Sc6:PCC - Out',
+                'Sc6:V_PFE1 - Instantaneous Voltage',
+                'Sc6:V_PFE2 - Instantaneous Voltage',
+                'Sc6:V_PFE3 - Instantaneous Voltage',
+                'Sc6:V_PFE4 - Instantaneous Voltage',
+                'Sc6:V_PFE5 - Instantaneous Voltage',
+                'Sc6:I_PFE1 - Instantaneous Current',
+                'Sc6:I_PFE2 - Instantaneous Current',
+                'Sc6:I_PFE3 - Instantaneous Current',
+                'Sc6:I_PFE4 - Instantaneous Current',
+                'Sc6:I_PFE5 - Instantaneous Current',
+                'Sc19:PCC - Out',
+                'Sc19:V_PFE1 - Instantaneous Voltage',
+                'Sc19:V_PFE2 - Instantaneous Voltage',
+                'Sc19:V_PFE3 - Instantaneous Voltage',
+                'Sc19:I_AFE - Instantaneous Current',
+                'Sc19:I_PFE1 - Instantaneous Current',
+                'Sc19:I_PFE2 - Instantaneous Current',
+                'Sc19:I_PFE3 - Instantaneous Current',
+                'Sc5:PCC - Out',
+                'Sc5:V_PFE1 - Instantaneous Voltage',
+                'Sc5:V_PFE2 - Instantaneous Voltage',
+                'Sc5:V_PFE3 - Instantaneous Voltage',
+                'Sc5:I_AFE - Instantaneous Current',
+                'Sc5:I_PFE1 - Instantaneous Current',
+                'Sc5:I_PFE2 - Instantaneous Current',
+                'Sc5:I_PFE3 - Instantaneous Current']
+if streaming:
+    stream_dir = os.path.join(pathlib.Path().absolute(), ".simba_stream", sst_model.Name)
+    t, signals = run_streaming(sst_model, signal_names, stream_dir, window_points=100000)
+else:
+    cache = ResultCache(os.path.join(pathlib.Path().absolute(), ".simba_cache"))
+    t, signals = run_design(filepath, sst_model, signal_names, cache)
+    signals = dict(zip(signal_names, signals))
+
+#%% Reduce to the plot resolution
+# min/max decimation (simba_stream) one column at a time: the memmaps are read once, only plot_points
+# samples per signal are kept in memory and the peaks stay visible
+plot_points = 20000
+decimated = {}
+for name in signal_names:
+    t_plot, column = decimate_minmax(t, signals[name][None, :], plot_points)
+    decimated[name] = np.array(column[0])
+t, signals = t_plot, decimated
 
 #%% Get results
-t = np.array(job.TimePoints) + 5
-VAFE = np.array(job.GetSignalByName('Sc6:V_AFE - Instantaneous Voltage').DataPoints)/1000
-IAFE = np.array(job.GetSignalByName('Sc6:I_AFE - Instantaneous Current').DataPoints)
+t = np.array(t) + 5
+VAFE = signals['Sc6:V_AFE - Instantaneous Voltage']/1000
+IAFE = signals['Sc6:I_AFE - Instantaneous Current']
 
-VPCC = np.array(job.GetSignalByName('Sc6:PCC - Out').DataPoints)
-VPFE1 = np.array(job.GetSignalByName('Sc6:V_PFE1 - Instantaneous Voltage').DataPoints)
-VPFE2 = np.array(job.GetSignalByName('Sc6:V_PFE2 - Instantaneous Voltage').DataPoints)
-VPFE3 = np.array(job.GetSignalByName('Sc6:V_PFE3 - Instantaneous Voltage').DataPoints)
-VPFE4 = np.array(job.GetSignalByName('Sc6:V_PFE4 - Instantaneous Voltage').DataPoints)
-VPFE5 = np.array(job.GetSignalByName('Sc6:V_PFE5 - Instantaneous Voltage').DataPoints)
-IPFE1 = np.array(job.GetSignalByName('Sc6:I_PFE1 - Instantaneous Current').DataPoints)
-IPFE2 = np.array(job.GetSignalByName('Sc6:I_PFE2 - Instantaneous Current').DataPoints)
-IPFE3 = np.array(job.GetSignalByName('Sc6:I_PFE3 - Instantaneous Current').DataPoints)
-IPFE4 = np.array(job.GetSignalByName('Sc6:I_PFE4 - Instantaneous Current').DataPoints)
-IPFE5 = np.array(job.GetSignalByName('Sc6:I_PFE5 - Instantaneous Current').DataPoints)
+VPCC = signals['Sc6:PCC - Out']
+VPFE1 = signals['Sc6:V_PFE1 - Instantaneous Voltage']
+VPFE2 = signals['Sc6:V_PFE2 - Instantaneous Voltage']
+VPFE3 = signals['Sc6:V_PFE3 - Instantaneous Voltage']
+VPFE4 = signals['Sc6:V_PFE4 - Instantaneous Voltage']
+VPFE5 = signals['Sc6:V_PFE5 - Instantaneous Voltage']
+IPFE1 = signals['Sc6:I_PFE1 - Instantaneous Current']
+IPFE2 = signals['Sc6:I_PFE2 - Instantaneous Current']
+IPFE3 = signals['Sc6:I_PFE3 - Instantaneous Current']
+IPFE4 = signals['Sc6:I_PFE4 - Instantaneous Current']
+IPFE5 = signals['Sc6:I_PFE5 - Instantaneous Current']
 
-VL1PCC = np.array(job.GetSignalByName('Sc19:PCC - Out').DataPoints)
-VL1PFE1 = np.array(job.GetSignalByName('Sc19:V_PFE1 - Instantaneous Voltage').DataPoints)
-VL1PFE2 = np.array(job.GetSignalByName('Sc19:V_PFE2 - Instantaneous Voltage').DataPoints)
-VL1PFE3 = np.array(job.GetSignalByName('Sc19:V_PFE3 - Instantaneous Voltage').DataPoints)
-IL1AFE = np.array(job.GetSignalByName('Sc19:I_AFE - Instantaneous Current').DataPoints)
-IL1PFE1 = np.array(job.GetSignalByName('Sc19:I_PFE1 - Instantaneous Current').DataPoints)
-IL1PFE2 = np.array(job.GetSignalByName('Sc19:I_PFE2 - Instantaneous Current').DataPoints)*2
-IL1PFE3 = np.array(job.GetSignalByName('Sc19:I_PFE3 - Instantaneous Current').DataPoints)
+VL1PCC = signals['Sc19:PCC - Out']
+VL1PFE1 = signals['Sc19:V_PFE1 - Instantaneous Voltage']
+VL1PFE2 = signals['Sc19:V_PFE2 - Instantaneous Voltage']
+VL1PFE3 = signals['Sc19:V_PFE3 - Instantaneous Voltage']
+IL1AFE = signals['Sc19:I_AFE - Instantaneous Current']
+IL1PFE1 = signals['Sc19:I_PFE1 - Instantaneous Current']
+IL1PFE2 = signals['Sc19:I_PFE2 - Instantaneous Current']*2
+IL1PFE3 = signals['Sc19:I_PFE3 - Instantaneous Current']
 
-VL2PCC = np.array(job.GetSignalByName('Sc5:PCC - Out').DataPoints)
-VL2PFE1 = np.array(job.GetSignalByName('Sc5:V_PFE1 - Instantaneous Voltage').DataPoints)
-VL2PFE2 = np.array(job.GetSignalByName('Sc5:V_PFE2 - Instantaneous Voltage').DataPoints)
-VL2PFE3 = np.array(job.GetSignalByName('Sc5:V_PFE3 - Instantaneous Voltage').DataPoints)
-IL2AFE = np.array(job.GetSignalByName('Sc5:I_AFE - Instantaneous Current').DataPoints)
-IL2PFE1 = np.array(job.GetSignalByName('Sc5:I_PFE1 - Instantaneous Current').DataPoints)
-IL2PFE2 = np.array(job.GetSignalByName('Sc5:I_PFE2 - Instantaneous Current').DataPoints)
-IL2PFE3 = np.array(job.GetSignalByName('Sc5:I_PFE3 - Instantaneous Current').DataPoints)
+VL2PCC = signals['Sc5:PCC - Out']
+VL2PFE1 = signals['Sc5:V_PFE1 - Instantaneous Voltage']
+VL2PFE2 = signals['Sc5:V_PFE2 - Instantaneous Voltage']
+VL2PFE3 = signals['Sc5:V_PFE3 - Instantaneous Voltage']
+IL2AFE = signals['Sc5:I_AFE - Instantaneous Current']
+IL2PFE1 = signals['Sc5:I_PFE1 - Instantaneous Current']
+IL2PFE2 = signals['Sc5:I_PFE2 - Instantaneous Current']
+IL2PFE3 = signals['Sc5:I_PFE3 - Instantaneous Current']
 
 #%% Plot Curve
 
@@ -17,30 +17,31 @@ import sys              # requires the installation os-sys package
 import os, pathlib
 import numpy as np
 import math
+from simba_timestep import apply_fast_mode
+from simba_ringbuffer import RingBuffer
+from simba_worker import SimulationWorker
+import simba_trace
 
 #%%  DECLARE VARIABLES
 
-array_t = []
-array_VAFE = []
-array_IAFE = []
-
-array_IPFE1 = []
-array_IPFE2 = []
-array_IPFE3 = []
-array_IPFE4 = []
-array_IPFE5 = []
-
-array_VL1PCC = []
-array_IL1AFE = []
-array_IL1PFE1 = []
-array_IL1PFE2 = []
-array_IL1PFE3 = []
-
-array_VL2PCC = []
-array_IL2AFE = []
-array_IL2PFE1 = []
-array_IL2PFE2 = []
-array_IL2PFE3 = []
+# Displayed signals, in the order of the lines returned by graph_init
+signal_names = ['Sc6:V_AFE - Instantaneous Voltage',
+                'Sc6:I_AFE - Instantaneous Current',
+                'Sc6:I_PFE1 - Instantaneous Current',
+                'Sc6:I_PFE2 - Instantaneous Current',
+                'Sc6:I_PFE3 - Instantaneous Current',
+                'Sc6:I_PFE4 - Instantaneous Current',
+                'Sc6:I_PFE5 - Instantaneous Current',
+                'Sc19:PCC - Out',
+                'Sc19:I_AFE - Instantaneous Current',
+                'Sc19:I_PFE1 - Instantaneous Current',
+                'Sc19:I_PFE2 - Instantaneous Current',
+                'Sc19:I_PFE3 - Instantaneous Current',
+                'Sc5:PCC - Out',
+                'Sc5:I_AFE - Instantaneous Current',
+                'Sc5:I_PFE1 - Instantaneous Current',
+                'Sc5:I_PFE2 - Instantaneous Current',
+                'Sc5:I_PFE3 - Instantaneous Current']
 
 VAL_H2 = 0;
 VAL_UPS = 0;
@@ -49,16 +50,23 @@ VAL_Batt = 0;
 Nb_sim_points = 1000
 Nb_display_points = 45000
 
+# Display memory: time + signals (channels x samples), latest Nb_display_points samples
+display_buffer = RingBuffer(1 + len(signal_names), Nb_display_points)
+
+# With SIMBA_TRACE set, every frame reports its solver and copy times
+frame_totals = {}
+
 #%%  DECLARE FUNCTIONS
 
 def circuit_init():
     # Open Project Design
     filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
     print("loading model: " + filepath)
-    # Open file
-    project = JsonProjectRepository(filepath)
+    # Open file (instrumented when SIMBA_TRACE is set)
+    project = simba_trace.open_project(filepath)
     sst_model = project.GetDesignByName("7 DCMicrogrid - CT")
     print("loading model: "+sst_model.Name)
+    apply_fast_mode(filepath, sst_model)  # SIMBA_FAST=1: recommended TimeStep of simba_timestep
     # Definitation of simulation
     sst_model.TransientAnalysis.NumberOfPointsToSimulate = Nb_sim_points
     job = sst_model.TransientAnalysis.NewJob()
@@ -124,99 +132,22 @@ def graph_init():
     return ax1,ax2,ax3,ax4,fig,ln_VAFE,ln_VL1PCC,ln_VL2PCC,ln_IAFE,ln_IPFE1,ln_IPFE2,ln_IPFE3,ln_IPFE4,ln_IPFE5, \
            ln_IL1AFE,ln_IL1PFE1,ln_IL1PFE2,ln_IL1PFE3,ln_IL2AFE,ln_IL2PFE1,ln_IL2PFE2,ln_IL2PFE3
 
-def get_results():
-    # get data points
-    status = job.Run()
-    t = np.array(job.TimePoints)
-    VAFE = np.array(job.GetSignalByName('Sc6:V_AFE - Instantaneous Voltage').DataPoints)
-    IAFE = np.array(job.GetSignalByName('Sc6:I_AFE - Instantaneous Current').DataPoints)
-
-    IPFE1 = np.array(job.GetSignalByName('Sc6:I_PFE1 - Instantaneous Current').DataPoints)
-    IPFE2 = np.array(job.GetSignalByName('Sc6:I_PFE2 - Instantaneous Current').DataPoints)
-    IPFE3 = np.array(job.GetSignalByName('Sc6:I_PFE3 - Instantaneous Current').DataPoints)
-    IPFE4 = np.array(job.GetSignalByName('Sc6:I_PFE4 - Instantaneous Current').DataPoints)
-    IPFE5 = np.array(job.GetSignalByName('Sc6:I_PFE5 - Instantaneous Current').DataPoints)
-
-    VL1PCC = np.array(job.GetSignalByName('Sc19:PCC - Out').DataPoints)
-    IL1AFE = np.array(job.GetSignalByName('Sc19:I_AFE - Instantaneous Current').DataPoints)
-    IL1PFE1 = np.array(job.GetSignalByName('Sc19:I_PFE1 - Instantaneous Current').DataPoints)
-    IL1PFE2 = np.array(job.GetSignalByName('Sc19:I_PFE2 - Instantaneous Current').DataPoints)
-    IL1PFE3 = np.array(job.GetSignalByName('Sc19:I_PFE3 - Instantaneous Current').DataPoints)
-
-    VL2PCC = np.array(job.GetSignalByName('Sc5:PCC - Out').DataPoints)
-    IL2AFE = np.array(job.GetSignalByName('Sc5:I_AFE - Instantaneous Current').DataPoints)
-    IL2PFE1 = np.array(job.GetSignalByName('Sc5:I_PFE1 - Instantaneous Current').DataPoints)
-    IL2PFE2 = np.array(job.GetSignalByName('Sc5:I_PFE2 - Instantaneous Current').DataPoints)
-    IL2PFE3 = np.array(job.GetSignalByName('Sc5:I_PFE3 - Instantaneous Current').DataPoints)
-
-    job.ClearScopesData()
-    return [t,VAFE,IAFE,IPFE1,IPFE2,IPFE3,IPFE4,IPFE5,VL1PCC,IL1AFE,IL1PFE1,IL1PFE2,IL1PFE3,VL2PCC,IL2AFE,IL2PFE1,IL2PFE2,IL2PFE3]
-
 def display(i):
-    # calcul des grandeurs
-    [t,VAFE,IAFE,IPFE1,IPFE2,IPFE3,IPFE4,IPFE5,VL1PCC,IL1AFE,IL1PFE1,IL1PFE2,IL1PFE3,VL2PCC,IL2AFE,IL2PFE1,IL2PFE2,IL2PFE3] = get_results()
-
-    # filling arrays with latest results
-    for i in range(len(t)):
-        array_t.append(t[i])
-        array_VAFE.append(VAFE[i])
-        array_IAFE.append(IAFE[i])
-
-        array_IPFE1.append(IPFE1[i])
-        array_IPFE2.append(IPFE2[i])
-        array_IPFE3.append(IPFE3[i])
-        array_IPFE4.append(IPFE4[i])
-        array_IPFE5.append(IPFE5[i])
-
-        array_VL1PCC.append(VL1PCC[i])
-        array_IL1AFE.append(IL1AFE[i])
-        array_IL1PFE1.append(IL1PFE1[i])
-        array_IL1PFE2.append(IL1PFE2[i])
-        array_IL1PFE3.append(IL1PFE3[i])
-
-        array_VL2PCC.append(VL2PCC[i])
-        array_IL2AFE.append(IL2AFE[i])
-        array_IL2PFE1.append(IL2PFE1[i])
-        array_IL2PFE2.append(IL2PFE2[i])
-        array_IL2PFE3.append(IL2PFE3[i])
-    # Deleting oldest values from arrays
-    if (len(array_t) > Nb_display_points):
-        del array_t[0:Nb_sim_points]
-        del array_VAFE[0:Nb_sim_points]
-        del array_IAFE[0:Nb_sim_points]
-        del array_IPFE1[0:Nb_sim_points]
-        del array_IPFE2[0:Nb_sim_points]
-        del array_IPFE3[0:Nb_sim_points]
-        del array_IPFE4[0:Nb_sim_points]
-        del array_IPFE5[0:Nb_sim_points]
-        del array_VL1PCC[0:Nb_sim_points]
-        del array_IL1AFE[0:Nb_sim_points]
-        del array_IL1PFE1[0:Nb_sim_points]
-        del array_IL1PFE2[0:Nb_sim_points]
-        del array_IL1PFE3[0:Nb_sim_points]
-        del array_VL2PCC[0:Nb_sim_points]
-        del array_IL2AFE[0:Nb_sim_points]
-        del array_IL2PFE1[0:Nb_sim_points]
-        del array_IL2PFE2[0:Nb_sim_points]
-        del array_IL2PFE3[0:Nb_sim_points]
+    # chunks computed by the simulation thread since the last frame, missed frames are skipped
+    chunks = worker.drain()
+    if not chunks:
+        return
+
+    # filling the display buffer with latest results, oldest values are overwritten
+    with simba_trace.span("Display.write"):
+        for t, data in chunks:
+            display_buffer.write(np.vstack((t, data.T)))
+    if simba_trace.ENABLED:
+        report_frame(i, len(chunks))
+    latest = display_buffer.view()
     # Update Data
-    ln_VAFE.set_data(array_t, array_VAFE)
-    ln_IAFE.set_data(array_t, array_IAFE)   
-    ln_IPFE1.set_data(array_t, array_IPFE1)
-    ln_IPFE2.set_data(array_t, array_IPFE2)
-    ln_IPFE3.set_data(array_t, array_IPFE3)
-    ln_IPFE4.set_data(array_t, array_IPFE4)
-    ln_IPFE5.set_data(array_t, array_IPFE5)
-    ln_VL1PCC.set_data(array_t, array_VL1PCC)
-    ln_IL1AFE.set_data(array_t, array_IL1AFE)
-    ln_IL1PFE1.set_data(array_t, array_IL1PFE1)
-    ln_IL1PFE2.set_data(array_t, array_IL1PFE2)
-    ln_IL1PFE3.set_data(array_t, array_IL1PFE3)
-    ln_VL2PCC.set_data(array_t, array_VL2PCC)
-    ln_IL2AFE.set_data(array_t, array_IL2AFE)
-    ln_IL2PFE1.set_data(array_t, array_IL2PFE1)
-    ln_IL2PFE2.set_data(array_t, array_IL2PFE2)
-    ln_IL2PFE3.set_data(array_t, array_IL2PFE3)
+    for k, line in enumerate(lines):
+        line.set_data(latest[0], latest[k + 1])
     # update Figure
     ax1.relim()
     ax1.autoscale_view(scalex=True, scaley=False)
@@ -227,22 +158,38 @@ def display(i):
     ax4.relim()
     ax4.autoscale_view(scalex=True, scaley=False)
 
+def report_frame(i, n_chunks):
+    # Solver time (Job.Run) against Python side copies since the previous frame
+    global frame_totals
+    totals = simba_trace.metrics.totals()
+    delta = {name: total - frame_totals.get(name, 0.0) for name, total in totals.items()}
+    frame_totals = totals
+    solver = delta.get("Job.Run", 0.0)
+    copy = delta.get("Worker.extract", 0.0) + delta.get("Display.write", 0.0)
+    print("frame " + str(i) + ": " + str(n_chunks) + " chunks, solver " + "%.1f" % (1e3 * solver) +
+          " ms, copy " + "%.1f" % (1e3 * copy) + " ms")
+
 def update_parameters():
     SP_H2_val = parameter_h2.get()
     SP_UPS_val = parameter_ups.get()
     SP_BESS_val = parameter_bess.get()
-    SP_H2.Value = SP_H2_val
-    SP_UPS.Value = SP_UPS_val
-    SP_BESS.Value = SP_BESS_val
+    # applied by the simulation thread between two chunks
+    worker.set_values({SP_H2.Name: SP_H2_val, SP_UPS.Name: SP_UPS_val, SP_BESS.Name: SP_BESS_val})
     print("SP H2: " + SP_H2_val)
     print("SP UPS: " + SP_UPS_val)
     print("SP BESS: " + SP_BESS_val)
 
 def quit():
+    worker.stop()
+    if simba_trace.ENABLED:
+        simba_trace.metrics.report()
     sys.exit()
 
 #%%  START PROCESS
 [job,SP_H2,SP_UPS,SP_BESS] = circuit_init()
+# the simulation runs in its own thread, the GUI only displays the queued chunks
+worker = SimulationWorker(job, signal_names, [SP_H2,SP_UPS,SP_BESS])
+worker.start()
 
 #%%  BUILD WINDOW
 window = Tk()
@@ -315,9 +262,12 @@ entry_bess.pack(fill='x', expand=True)
 # graphic
 [ax1,ax2,ax3,ax4,fig,ln_VAFE,ln_VL1PCC,ln_VL2PCC,ln_IAFE,ln_IPFE1,ln_IPFE2,ln_IPFE3,ln_IPFE4,ln_IPFE5, \
  ln_IL1AFE,ln_IL1PFE1,ln_IL1PFE2,ln_IL1PFE3,ln_IL2AFE,ln_IL2PFE1,ln_IL2PFE2,ln_IL2PFE3] = graph_init()
+lines = [ln_VAFE,ln_IAFE,ln_IPFE1,ln_IPFE2,ln_IPFE3,ln_IPFE4,ln_IPFE5, \
+         ln_VL1PCC,ln_IL1AFE,ln_IL1PFE1,ln_IL1PFE2,ln_IL1PFE3, \
+         ln_VL2PCC,ln_IL2AFE,ln_IL2PFE1,ln_IL2PFE2,ln_IL2PFE3]
 canvas_plots = FigureCanvasTkAgg(fig, block_plots)
 canvas_plots.get_tk_widget().pack(expand=YES)
-ani = animation.FuncAnimation(fig, display, interval=1,save_count=Nb_display_points+Nb_sim_points)
+ani = animation.FuncAnimation(fig, display, interval=40,save_count=Nb_display_points+Nb_sim_points)
 
 # display window
 window.mainloop()
@@ -0,0 +1,159 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Vectorized averaged model of the single DAB SST designs (models 1 and 2)
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import os, pathlib
+import numpy as np
+from simba_index import ProjectIndex
+
+#%%  Designs handled by the engine: True when the cell is voltage controlled
+DESIGNS = {"1 Single SST Current CTRL": False,
+           "2 Single SST": True}
+
+# Simba signal names of the cell, as extracted by Run_1 / Run_2
+SIGNALS = {"V_PRIM": 'Sc1:Sc1:V_PRIM - Instantaneous Voltage',
+           "V_SEC": 'Sc1:Sc1:V_SEC - Instantaneous Voltage',
+           "I_PRIM": 'Sc1:Sc1:I_PRIM - Instantaneous Current',
+           "I_SEC": 'Sc1:Sc1:I_SEC - Instantaneous Current'}
+
+#%%  DECLARE FUNCTIONS
+
+def design_parameters(filepath, design_name, overrides=None):
+    """Design variables as float arrays, overrides may hold one value per case.
+
+    Returns a dict name -> array of shape (n_cases,), all broadcast together.
+    """
+    values = {name: float(value) for name, value in ProjectIndex(filepath).variables(design_name).items()}
+    values.update(overrides or {})
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(value, dtype=float)) for value in values.values()])
+    return dict(zip(values, arrays))
+
+def step_profile(t, steps):
+    # Sum of Simba Step blocks, steps is a list of (step time, final value / I_LOAD)
+    profile = np.zeros_like(t)
+    for step_time, gain in steps:
+        profile += gain * (t >= step_time)
+    return profile
+
+def simulate(params, end_time, time_step=1e-6, voltage_control=False, save_every=1):
+    """Integrate the averaged SST cell for every case at once (forward Euler).
+
+    The equations follow the blocks of the SST-CELL subcircuit: primary and
+    secondary capacitors C_DC, MFT leakage as a first-order transfer function
+    K = 1/(L_LEAK*F_SW), Tau = 1/F_SW, PI current loop KP_I/KI_I and, for
+    model 2, the PI voltage loop KP_V/KI_V limited to +/-I_SST_LIMIT. The
+    primary is fed by the V_DC source through L_GRID/R_GRID. Model 1 has a
+    second 2*V_DC source on the secondary, model 2 a stepped current load.
+    Currents are returned with the orientation of the Simba current sources
+    (the Run scripts plot their negative). Returns t and a dict name ->
+    (n_cases x n_samples) array for V_PRIM, V_SEC, I_PRIM and I_SEC.
+    """
+    p = params
+    n_cases = len(next(iter(p.values())))
+    n_steps = int(round(end_time / time_step))
+    t_all = np.arange(n_steps + 1) * time_step
+    # load steps of the designs, scaled by I_LOAD of every case
+    if voltage_control:
+        profile = step_profile(t_all, [(0.01, -1.0), (0.05, 2.0), (0.09, -1.0)])
+    else:
+        profile = step_profile(t_all, [(0.01, 1.0), (0.05, -2.0), (0.09, 1.0)])
+
+    saved = np.arange(0, n_steps + 1, save_every)
+    out = {name: np.empty((n_cases, len(saved))) for name in SIGNALS}
+    dt = time_step
+
+    # states
+    v_prim = p["V_DC"].copy()
+    v_sec = p["V_DC"] * p["N_MFT"]
+    i_src = np.zeros(n_cases)        # primary DC source current
+    i_aux = np.zeros(n_cases)        # secondary DC source current (model 1)
+    i_l = np.zeros(n_cases)          # MFT current, secondary side
+    x_i = np.zeros(n_cases)          # current loop integrator
+    x_v = np.zeros(n_cases)          # voltage loop integrator
+    v_ref = p["V_DC"] * p["N_MFT"]
+    k_l = 1.0 / p["L_LEAK"]          # K / Tau of the MFT transfer function
+
+    s = 0
+    for k in range(n_steps + 1):
+        i_sec = i_l
+        i_prim = p["N_MFT"] * i_l
+        if k % save_every == 0:
+            out["V_PRIM"][:, s] = v_prim
+            out["V_SEC"][:, s] = v_sec
+            out["I_PRIM"][:, s] = -i_prim
+            out["I_SEC"][:, s] = -i_sec
+            s += 1
+        if k == n_steps:
+            break
+
+        # control loops
+        if voltage_control:
+            e_v = v_ref - v_sec
+            i_sp = np.clip(p["KP_V"] * e_v + x_v, -p["I_SST_LIMIT"], p["I_SST_LIMIT"])
+            x_v = x_v + p["KI_V"] * e_v * dt
+            i_load = profile[k] * p["I_LOAD"]
+        else:
+            i_sp = profile[k] * p["I_LOAD"]
+        e_i = i_sp - i_sec
+        u_l = p["KP_I"] * e_i + x_i
+        x_i = x_i + p["KI_I"] * e_i * dt
+
+        # plant
+        d_i_l = k_l * u_l - p["F_SW"] * i_l
+        d_i_src = (p["V_DC"] - v_prim - p["R_GRID"] * i_src) / p["L_GRID"]
+        d_v_prim = (i_src - i_prim) / p["C_DC"]
+        if voltage_control:
+            d_v_sec = (i_sec + i_load) / p["C_DC"]
+        else:
+            d_i_aux = (2 * p["V_DC"] - v_sec - p["R_GRID"] * i_aux) / p["L_GRID"]
+            d_v_sec = (i_sec + i_aux) / p["C_DC"]
+            i_aux = i_aux + d_i_aux * dt
+        i_l = i_l + d_i_l * dt
+        i_src = i_src + d_i_src * dt
+        v_prim = v_prim + d_v_prim * dt
+        v_sec = v_sec + d_v_sec * dt
+
+    return t_all[saved], out
+
+def run_design(filepath, design_name, overrides=None, time_step=None, save_every=1):
+    # Averaged run of a design with its own EndTime and TimeStep unless time_step is given
+    params = design_parameters(filepath, design_name, overrides)
+    analysis = ProjectIndex(filepath).analysis(design_name)
+    return simulate(params, float(analysis["EndTime"]), time_step or float(analysis["TimeStep"]),
+                    DESIGNS[design_name], save_every)
+
+def validate(t_ref, reference, t, simulated, case=0):
+    """Compare one engine case against stored Simba results.
+
+    reference and simulated are dicts keyed like SIGNALS. The engine trace is
+    interpolated on t_ref. Returns name -> (rms error, max error, rms error
+    relative to the reference peak).
+    """
+    report = {}
+    for name, ref in reference.items():
+        ref = np.asarray(ref, dtype=float)
+        sim = np.interp(t_ref, t, simulated[name][case])
+        error = sim - ref
+        rms = float(np.sqrt(np.mean(error ** 2)))
+        report[name] = (rms, float(np.max(np.abs(error))), rms / max(float(np.max(np.abs(ref))), 1e-12))
+    return report
+
+#%%  Validation mode: compare the engine with Simba results (taken from the result cache when stored)
+if __name__ == "__main__":
+    from simba_cache import ResultCache
+    from simba_sweep import open_design
+    import simba_sweep
+
+    filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
+    cache = ResultCache(os.path.join(pathlib.Path().absolute(), ".simba_cache"))
+    for design_name in DESIGNS:
+        sst_model = open_design(filepath, design_name)
+        t_ref, signals = simba_sweep.run_design(filepath, sst_model, list(SIGNALS.values()), cache)
+        reference = dict(zip(SIGNALS, signals))
+        t, simulated = run_design(filepath, design_name)
+        print("-> " + design_name)
+        for name, (rms, peak, relative) in validate(t_ref, reference, t, simulated).items():
+            print(name + "\t rms: " + str(rms) + "\t max: " + str(peak) + "\t relative: " + str(relative))
@@ -0,0 +1,151 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Benchmark of project loading, solving and signal extraction for all designs
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import argparse
+import json
+import multiprocessing
+import os, pathlib
+import platform
+import sys
+import time
+
+#%%  Designs benchmarked, (project file, design name)
+CASES = [("SST_DCMicroGrid_Models.jsimba", "1 Single SST Current CTRL"),
+         ("SST_DCMicroGrid_Models.jsimba", "2 Single SST"),
+         ("SST_DCMicroGrid_Models.jsimba", "3 Single SST with BESS and AFE"),
+         ("SST_DCMicroGrid_Models.jsimba", "4 MultiCell IPOS SST"),
+         ("SST_DCMicroGrid_Models.jsimba", "5 MultiCell ISOP SST"),
+         ("SST_DCMicroGrid_Models.jsimba", "6 DCMicrogrid"),
+         ("SST_DCMicroGrid_Models.jsimba", "7 DCMicrogrid - CT"),
+         ("SST_Switched_Model.jsimba", "Semiconductor level Blocks - Voltage Control"),
+         ("SST_Switched_Model.jsimba", "System level SST Block")]
+
+PHASES = ["import", "load", "new_job", "run", "extract"]
+
+#%%  DECLARE FUNCTIONS
+
+def peak_rss():
+    # Peak resident set size of this process in bytes, None when it cannot be measured
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == "darwin" else rss * 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset
+    except (ImportError, AttributeError):
+        return None
+
+def benchmark_case(filepath, design_name, end_time=None):
+    """Time every phase of one design run, in a fresh process (see run_benchmark)."""
+    timings = {}
+    start = time.perf_counter()
+    from aesim.simba import JsonProjectRepository
+    from simba_index import ProjectIndex
+    from simba_signals import extract_columns
+    timings["import"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    project = JsonProjectRepository(filepath)
+    design = project.GetDesignByName(design_name)
+    timings["load"] = time.perf_counter() - start
+    if end_time is not None:
+        design.TransientAnalysis.EndTime = end_time
+
+    start = time.perf_counter()
+    job = design.TransientAnalysis.NewJob()
+    timings["new_job"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    status = job.Run()
+    timings["run"] = time.perf_counter() - start
+
+    signal_names = ProjectIndex(filepath).signals(design_name)
+    start = time.perf_counter()
+    t, data, index = extract_columns(job, signal_names)
+    timings["extract"] = time.perf_counter() - start
+
+    return {"timings_s": timings,
+            "total_s": sum(timings.values()),
+            "points": len(t),
+            "signals": len(signal_names),
+            "points_per_s": len(t) / timings["run"] if timings["run"] > 0 else None,
+            "bytes_extracted": int(t.nbytes + data.nbytes),
+            "peak_rss_bytes": peak_rss()}
+
+def run_benchmark(directory, end_time=None, designs=None):
+    # One spawned process per design so import, load and peak RSS are measured from a cold start
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for filename, design_name in CASES:
+        if designs and design_name not in designs:
+            continue
+        print("-> Benchmark " + design_name)
+        with context.Pool(1) as pool:
+            result = pool.apply(benchmark_case, (os.path.join(directory, filename), design_name, end_time))
+        results[filename + "::" + design_name] = result
+        print("   " + " ".join(name + "=" + "%.3f" % value + "s" for name, value in result["timings_s"].items()))
+    return {"end_time": end_time, "python": platform.python_version(), "platform": platform.platform(),
+            "results": results}
+
+def compare(report, baseline, time_tolerance=0.2, rss_tolerance=0.2, min_delta_s=0.05):
+    """Regressions of report against baseline, as a list of messages.
+
+    A phase regresses when its wall time grows by more than time_tolerance
+    (relative) and by more than min_delta_s, so the jitter of phases lasting a
+    few milliseconds is not flagged. The peak RSS regresses when it grows by
+    more than rss_tolerance. Only designs present in both reports are
+    compared, a baseline run with another EndTime raises ValueError.
+    """
+    regressions = []
+    if report.get("end_time") != baseline.get("end_time"):
+        raise ValueError("EndTime differs from the baseline (" + str(report.get("end_time")) + " vs " +
+                         str(baseline.get("end_time")) + "), rerun with the same --end-time")
+    for case, result in report["results"].items():
+        reference = baseline["results"].get(case)
+        if reference is None:
+            continue
+        for phase in PHASES:
+            now, before = result["timings_s"].get(phase), reference["timings_s"].get(phase)
+            if now is not None and before and now - before > max(time_tolerance * before, min_delta_s):
+                regressions.append(case + ": " + phase + " " + "%.3f" % before + "s -> " + "%.3f" % now + "s")
+        now, before = result.get("peak_rss_bytes"), reference.get("peak_rss_bytes")
+        if now is not None and before and now > before * (1 + rss_tolerance):
+            regressions.append(case + ": peak RSS " + str(before) + " -> " + str(now) + " bytes")
+    return regressions
+
+#%%  Run the benchmark, write the JSON report and compare it with a baseline report
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the Simba designs of this repository")
+    parser.add_argument("--end-time", type=float, default=None, help="override EndTime of every design")
+    parser.add_argument("--design", action="append", help="benchmark only this design (repeatable)")
+    parser.add_argument("--output", default="benchmark.json", help="JSON report written by this run")
+    parser.add_argument("--baseline", help="JSON report of a previous run to compare against")
+    parser.add_argument("--time-tolerance", type=float, default=0.2)
+    parser.add_argument("--rss-tolerance", type=float, default=0.2)
+    parser.add_argument("--min-delta", type=float, default=0.05, help="smallest phase slowdown reported [s]")
+    args = parser.parse_args()
+
+    report = run_benchmark(str(pathlib.Path().absolute()), args.end_time, args.design)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print("-> Report written to " + args.output)
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)
+        try:
+            regressions = compare(report, baseline, args.time_tolerance, args.rss_tolerance, args.min_delta)
+        except ValueError as error:
+            print("error: " + str(error), file=sys.stderr)
+            sys.exit(2)
+        for message in regressions:
+            print("REGRESSION " + message)
+        if regressions:
+            sys.exit(1)
+        print("-> No regression against " + args.baseline)
@@ -0,0 +1,120 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Content-addressed on-disk cache of transient job results
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import os, pathlib
+import hashlib
+import json
+import shutil
+import tempfile
+import time
+import numpy as np
+from simba_index import ProjectIndex
+from simba_project import get_design, referenced_definitions
+
+#%%  DECLARE FUNCTIONS
+
+def design_json(filepath, design_name):
+    # JSON subtree of one design plus the shared subcircuits it uses, serialized in a stable way
+    project = ProjectIndex(filepath).load_project([design_name])
+    content = {"Design": get_design(project, design_name),
+               "Definitions": referenced_definitions(project, design_name)}
+    return json.dumps(content, sort_keys=True, separators=(",", ":"))
+
+def cache_key(filepath, design_name, values, analysis):
+    # Hash of the design subtree, the variable values and the analysis settings
+    key = hashlib.sha256()
+    key.update(design_json(filepath, design_name).encode())
+    key.update(json.dumps({name: str(value) for name, value in values.items()}, sort_keys=True).encode())
+    key.update(json.dumps({name: str(value) for name, value in analysis.items()}, sort_keys=True).encode())
+    return key.hexdigest()
+
+def folder_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+class ResultCache:
+    """On-disk store of TimePoints and signals keyed by cache_key().
+
+    Each entry is a folder holding t.npy, signals.npy (one row per signal) and
+    names.json. Entries are reloaded memory-mapped and the least recently used
+    ones are removed once the cache grows above max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=10e9):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def get(self, key, signal_names):
+        # Return (t, signals) or None when the entry is missing or lacks a signal
+        entry = os.path.join(self.directory, key)
+        if not os.path.isdir(entry):
+            return None
+        with open(os.path.join(entry, "names.json"), "r") as f:
+            names = json.load(f)
+        if not all(name in names for name in signal_names):
+            return None
+        t = np.load(os.path.join(entry, "t.npy"), mmap_mode="r")
+        data = np.load(os.path.join(entry, "signals.npy"), mmap_mode="r")
+        index = {name: k for k, name in enumerate(names)}
+        os.utime(entry)  # mark as recently used
+        return t, [data[index[name]] for name in signal_names]
+
+    def put(self, key, t, signal_names, signals):
+        # Store a finished job, then evict the oldest entries above the size limit
+        # one tmp folder per writer, workers and nodes may store the same key at once
+        entry = os.path.join(self.directory, key)
+        tmp = tempfile.mkdtemp(prefix=key + ".", suffix=".tmp", dir=self.directory)
+        np.save(os.path.join(tmp, "t.npy"), np.asarray(t, dtype=float))
+        np.save(os.path.join(tmp, "signals.npy"), np.asarray(signals, dtype=float).reshape(len(signal_names), len(t)))
+        with open(os.path.join(tmp, "names.json"), "w") as f:
+            json.dump(list(signal_names), f)
+        if os.path.isdir(entry) and not self.holds(entry, signal_names):
+            shutil.rmtree(entry, ignore_errors=True)  # older entry without some of these signals
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # another writer stored the key first, its entry holds the same results
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    def holds(self, entry, signal_names):
+        try:
+            with open(os.path.join(entry, "names.json"), "r") as f:
+                names = json.load(f)
+        except (OSError, ValueError):
+            return False
+        return all(name in names for name in signal_names)
+
+    def evict(self):
+        # sweep workers share the cache, entries may vanish while we scan
+        entries, sizes, used = [], {}, {}
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir():
+                continue
+            if entry.name.endswith(".tmp"):
+                # <key>.<random>.tmp folders of writers in progress, removed once a writer left one for an hour
+                try:
+                    if time.time() - entry.stat().st_mtime > 3600:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                except FileNotFoundError:
+                    pass
+                continue
+            try:
+                used[entry.path] = entry.stat().st_mtime
+                sizes[entry.path] = folder_size(entry.path)
+            except FileNotFoundError:
+                continue
+            entries.append(entry.path)
+        entries.sort(key=used.get)
+        total = sum(sizes.values())
+        # always keep the newest entry, even if it alone is above the limit
+        for entry in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= sizes[entry]
+            print("-> Cache evicted " + os.path.basename(entry))
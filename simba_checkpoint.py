@@ -0,0 +1,189 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Checkpoint and restart of long streamed transient runs
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+# Usage:
+#   python simba_checkpoint.py "6 DCMicrogrid" -o results/microgrid_16s
+# run the same command again after an interruption: the run resumes from its last checkpoint.
+
+#%%  Load required module
+import argparse
+import json
+import os, pathlib
+import time
+import numpy as np
+from simba_index import ProjectIndex
+from simba_signals import extract_columns
+from simba_stream import stream_files, write_meta, append_window, open_streamed
+
+CHECKPOINT_VERSION = 1
+
+#%%  DECLARE FUNCTIONS
+
+def checkpoint_file(directory):
+    return os.path.join(directory, "checkpoint.json")
+
+def load_checkpoint(directory):
+    path = checkpoint_file(directory)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+def save_checkpoint(directory, files, checkpoint):
+    # Results reach the disk before the checkpoint that counts them, the checkpoint is replaced atomically
+    for path in files:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    tmp = checkpoint_file(directory) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, checkpoint_file(directory))
+
+def run_identity(filepath, design, signal_names, window_points, values, schedule):
+    # What a checkpoint must match to be resumed: same project content, run settings, initial values and schedule
+    return {"version": CHECKPOINT_VERSION, "sha256": ProjectIndex(filepath).index["sha256"], "design": design.Name,
+            "signals": list(signal_names), "window_points": window_points,
+            "time_step": str(design.TransientAnalysis.TimeStep), "end_time": str(design.TransientAnalysis.EndTime),
+            "initial_values": {name: str(value) for name, value in values.items()},
+            "schedule": [[float(time_point), {name: str(value) for name, value in setpoint.items()}]
+                         for time_point, setpoint in schedule]}
+
+def due_setpoints(schedule, t_next, applied):
+    # Schedule entries (time, values) reached at t_next and not applied yet
+    return [k for k, (time_point, values) in enumerate(schedule) if time_point <= t_next and k not in applied]
+
+def run_checkpointed(filepath, design_name, signal_names, directory, values=None, schedule=None,
+                     window_points=100000, checkpoint_windows=10):
+    """Stream a long transient run to disk with periodic checkpoints, resuming an interrupted run.
+
+    The job advances window_points samples per Run(), as in simba_stream and
+    the continuous time script. schedule is a list of (time, {variable:
+    value}) setpoint changes, applied between two windows. Every
+    checkpoint_windows windows, checkpoint.json records the simulated time,
+    the number of points and windows kept, the variable values and the
+    window of every applied setpoint change.
+
+    Simba cannot restore a solver state, so a restart replays the recorded
+    windows and setpoint changes up to the checkpoint without extracting
+    or writing anything, cuts the stream files back to the checkpoint and
+    continues from there: the outputs stitch sample for sample. Returns t,
+    the signals as np.memmap (see open_streamed) and a report of the time
+    saved by the checkpoint.
+    """
+    from simba_sweep import open_design, set_variables
+    values = dict(values or {})
+    schedule = sorted(schedule or [], key=lambda entry: entry[0])
+    design = open_design(filepath, design_name)
+    variables = {variable.Name: variable for variable in design.Circuit.Variables}
+    # the setpoint changes touch more than values, every variable is restored at the end
+    previous = {name: variable.Value for name, variable in variables.items()}
+    set_variables(design, values, variables)
+    analysis = design.TransientAnalysis
+    end_time = float(analysis.EndTime)
+    identity = run_identity(filepath, design, signal_names, window_points, values, schedule)
+
+    os.makedirs(directory, exist_ok=True)
+    files = stream_files(directory, len(signal_names))
+    checkpoint = load_checkpoint(directory)
+    if checkpoint is not None and checkpoint["identity"] != identity:
+        print("-> Checkpoint of another run setup in " + directory + ", starting over")
+        checkpoint = None
+    if checkpoint is None:
+        checkpoint = {"identity": identity, "windows": 0, "points": 0, "time": 0.0, "wall_s": 0.0,
+                      "applied": [], "variables": {}, "done": False}
+        for path in files:
+            open(path, "wb").close()
+        write_meta(directory, signal_names, 0, 0.0)
+    elif checkpoint["done"]:
+        print("-> Run already complete in " + directory)
+        set_variables(design, previous, variables)
+        return open_streamed(directory) + ({"resumed_at": checkpoint["time"], "saved_s": 0.0},)
+
+    previous_points = analysis.NumberOfPointsToSimulate
+    analysis.NumberOfPointsToSimulate = window_points
+    try:
+        job = analysis.NewJob()
+        report = {"resumed_at": checkpoint["time"], "saved_s": 0.0}
+        if checkpoint["windows"]:
+            # keep the samples counted by the checkpoint, drop what was written after it
+            for path in files:
+                os.truncate(path, 8 * checkpoint["points"])
+            write_meta(directory, signal_names, checkpoint["points"], checkpoint["time"])
+            changes = {}
+            for window, k, setpoint in checkpoint["applied"]:
+                changes.setdefault(window, []).append(setpoint)
+            print("-> Resuming at t = " + str(checkpoint["time"]) + " s, replaying " + str(checkpoint["windows"]) +
+                  " windows")
+            start = time.perf_counter()
+            for window in range(checkpoint["windows"]):
+                for setpoint in changes.get(window, []):
+                    set_variables(design, setpoint, variables)
+                status = job.Run()
+                job.ClearScopesData()
+            replay = time.perf_counter() - start
+            report["replay_s"] = replay
+            report["saved_s"] = checkpoint["wall_s"] - replay
+            print("-> Replay took " + "%.1f" % replay + " s against " + "%.1f" % checkpoint["wall_s"] +
+                  " s to compute and stream the same time, " + "%.1f" % report["saved_s"] + " s saved")
+
+        applied = set(k for window, k, setpoint in checkpoint["applied"])
+        start = time.perf_counter() - checkpoint["wall_s"]
+        n_points, t_last = checkpoint["points"], checkpoint["time"]
+        print("-> Checkpointed Job Started ")
+        while True:
+            for k in due_setpoints(schedule, t_last + float(analysis.TimeStep), applied):
+                set_variables(design, schedule[k][1], variables)
+                checkpoint["applied"].append([checkpoint["windows"], k, {name: str(value) for name, value in schedule[k][1].items()}])
+                applied.add(k)
+                print("-> t = " + str(t_last) + " s, setpoints " + str(schedule[k][1]))
+            status = job.Run()
+            t, data, index = extract_columns(job, signal_names)
+            job.ClearScopesData()
+            checkpoint["windows"] += 1
+            if len(t) == 0:
+                break
+            keep = int(np.searchsorted(t, end_time, side="right"))
+            append_window(files, t[:keep], data[:keep])
+            n_points += keep
+            t_last = float(t[keep - 1]) if keep else end_time
+            write_meta(directory, signal_names, n_points, t_last)
+            finished = bool(keep < len(t) or t[-1] >= end_time)
+            if finished or checkpoint["windows"] % checkpoint_windows == 0:
+                checkpoint.update({"points": n_points, "time": t_last, "wall_s": time.perf_counter() - start,
+                                   "variables": {name: variable.Value for name, variable in variables.items()},
+                                   "done": finished})
+                save_checkpoint(directory, files, checkpoint)
+                print("-> Checkpoint at t = " + str(t_last) + " s")
+            if finished:
+                break
+        checkpoint.update({"points": n_points, "time": t_last, "wall_s": time.perf_counter() - start, "done": True})
+        save_checkpoint(directory, files, checkpoint)
+        print("-> Checkpointed Job Done ")
+    finally:
+        analysis.NumberOfPointsToSimulate = previous_points
+        set_variables(design, previous, variables)
+    return open_streamed(directory) + (report,)
+
+#%%  Run a long design with checkpoints, rerun the same command to resume it
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checkpointed streaming run of a long transient")
+    parser.add_argument("design", nargs="?", default="6 DCMicrogrid")
+    parser.add_argument("--file", default=os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba"))
+    parser.add_argument("-o", "--output", required=True, help="stream and checkpoint directory")
+    parser.add_argument("--signal", action="append", help="streamed signal (repeatable, default: all)")
+    parser.add_argument("--window", type=int, default=100000, help="samples per Run()")
+    parser.add_argument("--every", type=int, default=10, help="windows between two checkpoints")
+    args = parser.parse_args()
+
+    signal_names = args.signal or ProjectIndex(args.file).signals(args.design)
+    t, signals, report = run_checkpointed(args.file, args.design, signal_names, args.output,
+                                          window_points=args.window, checkpoint_windows=args.every)
+    print("-> " + str(len(t)) + " points up to t = " + str(t[-1]) + " s in " + args.output)
@@ -0,0 +1,138 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Headless command line entry point: list, signals, run
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+# Usage:
+#   python simba_cli.py list [--variables]
+#   python simba_cli.py signals "2 Single SST" [--match V_SEC]
+#   python simba_cli.py run "2 Single SST" --set KI_V=2000 --signal "Sc1:Sc1:V_SEC - Instantaneous Voltage" -o out.npz
+#   python simba_cli.py run "6 DCMicrogrid" -o results/microgrid      (chunked result store, see simba_store)
+# Simba and matplotlib are only imported by the commands that need them.
+
+#%%  Load required module
+import argparse
+import os, pathlib
+import sys
+import numpy as np
+from simba_index import ProjectIndex
+from simba_overrides import DesignTemplate
+from simba_store import write_result
+
+DEFAULT_FILE = "SST_DCMicroGrid_Models.jsimba"
+
+#%%  DECLARE FUNCTIONS
+
+def parse_assignments(assignments):
+    # ["NAME=VALUE", ...] -> {NAME: VALUE}
+    values = {}
+    for assignment in assignments or []:
+        name, sep, value = assignment.partition("=")
+        if not sep or not name:
+            raise argparse.ArgumentTypeError("expected NAME=VALUE, got " + assignment)
+        values[name.strip()] = value.strip()
+    return values
+
+def write_results(path, t, signal_names, signals, metadata=None):
+    # .csv: one column per signal, .npz: t, signals (one row per signal) and names,
+    # otherwise a result store directory holding the run metadata
+    if path.endswith(".csv"):
+        header = ",".join(["t"] + list(signal_names))
+        np.savetxt(path, np.column_stack([t] + list(signals)), delimiter=",", header=header, comments="")
+    elif path.endswith(".npz"):
+        np.savez(path, t=np.asarray(t), signals=np.vstack(signals), names=np.array(signal_names))
+    else:
+        write_result(path, t, signal_names, signals, metadata)
+
+def plot_results(t, signal_names, signals, title):
+    import matplotlib.pyplot as plt
+    fig, ax = plt.subplots()
+    ax.set_title(title)
+    for name, y in zip(signal_names, signals):
+        ax.plot(t, y, label=name)
+    ax.set_xlabel('time [s]')
+    ax.grid(True)
+    ax.legend(loc='lower left')
+    plt.show()
+
+def command_list(args):
+    index = ProjectIndex(args.file)
+    for design_name in index.design_names():
+        analysis = index.analysis(design_name)
+        print(design_name + "\t EndTime: " + analysis["EndTime"] + "\t TimeStep: " + analysis["TimeStep"])
+        if args.variables:
+            for name, value in index.variables(design_name).items():
+                print("    Name: " + name + "\t Value: " + value)
+
+def command_signals(args):
+    index = ProjectIndex(args.file)
+    for name in index.signals(args.design):
+        if args.match is None or args.match in name:
+            print(name)
+
+def command_run(args):
+    index = ProjectIndex(args.file)
+    # overrides are validated as in the sweep, tune and queue entry points
+    config = DesignTemplate(args.file, args.design).configure(parse_assignments(args.set))
+    signal_names = args.signal or index.signals(args.design)
+    for name in signal_names:
+        index.resolve_signal(args.design, name)
+
+    from simba_sweep import open_design, set_variables, run_design, analysis_settings
+    from simba_cache import ResultCache
+    design = open_design(args.file, args.design)
+    set_variables(design, config.values())
+    if args.end_time is not None:
+        design.TransientAnalysis.EndTime = args.end_time
+    cache = ResultCache(args.cache) if args.cache else None
+    t, signals = run_design(args.file, design, signal_names, cache)
+    print("-> Job Done, " + str(len(t)) + " points, " + str(len(signal_names)) + " signals")
+    if args.output:
+        metadata = {"file": os.path.basename(args.file), "design": args.design,
+                    "variables": {variable.Name: variable.Value for variable in design.Circuit.Variables},
+                    "analysis": {name: str(value) for name, value in analysis_settings(design).items()}}
+        write_results(args.output, t, signal_names, signals, metadata)
+        print("-> Results written to " + args.output)
+    if args.plot:
+        plot_results(t, signal_names, signals, args.design)
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run the Simba designs of this repository without GUI")
+    parser.add_argument("--file", default=os.path.join(pathlib.Path().absolute(), DEFAULT_FILE),
+                        help="jsimba project file (default: " + DEFAULT_FILE + ")")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list designs")
+    list_parser.add_argument("--variables", action="store_true", help="also list the variables of every design")
+    list_parser.set_defaults(handler=command_list)
+
+    signals_parser = commands.add_parser("signals", help="list the signals of a design")
+    signals_parser.add_argument("design")
+    signals_parser.add_argument("--match", help="only signals containing this text")
+    signals_parser.set_defaults(handler=command_signals)
+
+    run_parser = commands.add_parser("run", help="run a design")
+    run_parser.add_argument("design")
+    run_parser.add_argument("--set", action="append", metavar="NAME=VALUE", help="variable override (repeatable)")
+    run_parser.add_argument("--signal", action="append", help="signal to extract (repeatable, default: all)")
+    run_parser.add_argument("--end-time", type=float, help="override EndTime")
+    run_parser.add_argument("-o", "--output", help="write the results (.npz, .csv or a result store directory)")
+    run_parser.add_argument("--cache", help="result cache directory")
+    run_parser.add_argument("--plot", action="store_true", help="plot the results (imports matplotlib)")
+    run_parser.set_defaults(handler=command_run)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        args.handler(args)
+    except (KeyError, ValueError, argparse.ArgumentTypeError) as error:
+        # str() of a KeyError adds quotes around the message
+        message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+        print("error: " + str(message), file=sys.stderr)
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
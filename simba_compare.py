@@ -0,0 +1,123 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Concurrent switched against averaged model comparison
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os, pathlib
+import numpy as np
+from simba_index import ProjectIndex
+from simba_sweep import run_config
+from simba_overrides import DesignTemplate
+
+SWITCHED_DESIGN = "Semiconductor level Blocks - Voltage Control"
+AVERAGED_DESIGN = "System level SST Block"
+
+# (switched signal, averaged signal, sign applied to the averaged signal)
+SIGNAL_PAIRS = [('C1 - Instantaneous Voltage', 'Sc4:Sc1:V_SEC - Instantaneous Voltage', 1.0),
+                ('CP3 - Instantaneous Current', 'Sc4:Sc1:I_SEC - Instantaneous Current', -1.0)]
+
+#%%  DECLARE FUNCTIONS
+
+def run_concurrently(filepath, jobs, processes=None, cache_dir=None):
+    # jobs: list of (design name, variable values, signal names), results (t, signals) in the same order
+    templates = {design_name: DesignTemplate(filepath, design_name) for design_name, values, signal_names in jobs}
+    configs = [templates[design_name].configure(values) for design_name, values, signal_names in jobs]
+    processes = max(1, min(processes or os.cpu_count() or 1, len(jobs)))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        futures = [executor.submit(run_config, config, signal_names, cache_dir)
+                   for config, (design_name, values, signal_names) in zip(configs, jobs)]
+        return [future.result() for future in futures]
+
+def cycle_average(t, y, f_sw, t_out):
+    """Average of y over the switching period ending at every t_out (t_out >= 1/F_SW).
+
+    Uses the cumulative trapezoidal integral, so the whole waveform is
+    averaged in one pass whatever its time step.
+    """
+    t = np.asarray(t, dtype=float)
+    y = np.asarray(y, dtype=float)
+    integral = np.concatenate(([0.0], np.cumsum(0.5 * (y[1:] + y[:-1]) * np.diff(t))))
+    period = 1.0 / f_sw
+    return (np.interp(t_out, t, integral) - np.interp(t_out - period, t, integral)) / period
+
+def error_metrics(switched, averaged):
+    """Error metrics of (n_points x n_samples) aligned arrays, one value per operating point.
+
+    rms and max are computed on the sample-wise error, bias is the mean of
+    the cycle averaged error and relative_rms is rms over the range of the
+    averaged waveform, or over its mean magnitude when that is larger.
+    """
+    error = switched - averaged
+    rms = np.sqrt(np.mean(error ** 2, axis=1))
+    span = np.maximum(np.maximum(np.ptp(averaged, axis=1), np.mean(np.abs(averaged), axis=1)), 1e-12)
+    return {"rms": rms, "max": np.max(np.abs(error), axis=1), "bias": np.mean(error, axis=1),
+            "relative_rms": rms / span}
+
+def operating_points(i_loads, v_out_refs, v_dc=1000.0):
+    """Variable sets of both designs for every (I_LOAD, V_OUT_REF) pair.
+
+    The averaged block has no V_OUT_REF, its output reference is N_MFT*V_DC,
+    so V_OUT_REF is mapped on N_MFT = V_OUT_REF / V_DC.
+    """
+    points = []
+    for i_load in i_loads:
+        for v_out in v_out_refs:
+            points.append(({"I_LOAD": i_load, "V_OUT_REF": v_out},
+                           {"I_LOAD": i_load, "N_MFT": v_out / v_dc}))
+    return points
+
+def compare_results(switched_runs, averaged_runs, f_sw, pairs=None, start_time=None):
+    """Align the switched runs on the averaged time base and compute the metrics.
+
+    switched_runs and averaged_runs are lists of (t, signals) with signals in
+    the order of pairs. Every switched waveform is averaged over the switching
+    period ending at each averaged time point (from one period, or
+    start_time, on). Returns t, a dict averaged signal -> metrics and the
+    aligned (n_points x n_samples) arrays of both models.
+    """
+    pairs = pairs or SIGNAL_PAIRS
+    t_avg = np.asarray(averaged_runs[0][0], dtype=float)
+    start = max(1.0 / f_sw, start_time or 0.0)
+    end = min(float(t[-1]) for t, signals in switched_runs + averaged_runs)
+    t_out = t_avg[(t_avg >= start) & (t_avg <= end)]
+    metrics, aligned = {}, {}
+    for k, (switched_name, averaged_name, sign) in enumerate(pairs):
+        averaged = sign * np.vstack([np.interp(t_out, t, signals[k]) for t, signals in averaged_runs])
+        switched = np.vstack([cycle_average(t, signals[k], f_sw, t_out) for t, signals in switched_runs])
+        metrics[averaged_name] = error_metrics(switched, averaged)
+        aligned[averaged_name] = (switched, averaged)
+    return t_out, metrics, aligned
+
+def compare_models(filepath, points, pairs=None, processes=None, cache_dir=None, start_time=None):
+    """Run both designs at every operating point concurrently and compare them.
+
+    points is a list of (switched values, averaged values), see
+    operating_points. F_SW is read from the averaged design.
+    """
+    pairs = pairs or SIGNAL_PAIRS
+    f_sw = float(ProjectIndex(filepath).variables(AVERAGED_DESIGN)["F_SW"])
+    jobs = []
+    for switched_values, averaged_values in points:
+        jobs.append((SWITCHED_DESIGN, switched_values, [switched for switched, averaged, sign in pairs]))
+        jobs.append((AVERAGED_DESIGN, averaged_values, [averaged for switched, averaged, sign in pairs]))
+    print("-> Comparison on " + str(len(points)) + " operating points, " + str(len(jobs)) + " jobs")
+    results = run_concurrently(filepath, jobs, processes, cache_dir)
+    return compare_results(results[0::2], results[1::2], f_sw, pairs, start_time)
+
+#%%  Compare both models over a grid of operating points
+if __name__ == "__main__":
+    filepath = os.path.join(pathlib.Path().absolute(), "SST_Switched_Model.jsimba")
+    points = operating_points([125, 250, 375], [1800, 2000, 2200])
+    t, metrics, aligned = compare_models(filepath, points,
+                                         cache_dir=os.path.join(pathlib.Path().absolute(), ".simba_cache"))
+    for name, values in metrics.items():
+        print("-> " + name)
+        print("I_LOAD\t V_OUT_REF\t rms\t max\t bias\t relative rms")
+        for k, (switched_values, averaged_values) in enumerate(points):
+            print(str(switched_values["I_LOAD"]) + "\t " + str(switched_values["V_OUT_REF"]) + "\t " +
+                  "\t ".join("%.4g" % values[metric][k] for metric in ["rms", "max", "bias", "relative_rms"]))
@@ -0,0 +1,96 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Signal groups of the multi-cell designs and cell balancing metrics
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import re
+import numpy as np
+from simba_index import ProjectIndex
+from simba_signals import extract_columns
+
+#%%  DECLARE FUNCTIONS
+
+def group_regex(pattern):
+    # {n} stands for the cell number, * for any text, everything else is literal
+    parts = re.split(r"(\{n\}|\*)", pattern)
+    regex = "".join("(\\d+)" if part == "{n}" else ".*" if part == "*" else re.escape(part) for part in parts)
+    return re.compile(regex)
+
+def expand_group(signal_names, pattern):
+    """Signal names matching pattern, sorted by cell number.
+
+    In the pattern, {n} matches the cell number (e.g. 'Sc1:Sc{n}:Sc1:V_SEC -
+    Instantaneous Voltage' or 'Sc1:Sc1:V_CELL{n} - Instantaneous Voltage') and
+    * any text. Without {n} the names keep the order of signal_names.
+    """
+    regex = group_regex(pattern)
+    matches = []
+    for position, name in enumerate(signal_names):
+        match = regex.fullmatch(name)
+        if match:
+            matches.append((int(match.group(1)) if regex.groups else position, name))
+    if not matches:
+        raise KeyError("no signal matches " + pattern)
+    return [name for number, name in sorted(matches)]
+
+def extract_groups(job, filepath, design_name, groups, signal_names=None):
+    """Extract signal groups and single signals of a job in one pass.
+
+    groups maps a group name to a pattern expanded against the probes of the
+    design (see expand_group). Returns t, a dict group name -> (n_cells x
+    n_samples) array, the member names of every group and a dict single
+    signal name -> array. The group arrays are views of the extracted array.
+    """
+    available = ProjectIndex(filepath).signals(design_name)
+    members = {group: expand_group(available, pattern) for group, pattern in groups.items()}
+    names = [name for group in members.values() for name in group] + list(signal_names or [])
+    t, data, index = extract_columns(job, names)
+    arrays, start = {}, 0
+    for group, group_names in members.items():
+        # consecutive columns of a Fortran array: the transpose is a C ordered view
+        arrays[group] = data[:, start:start + len(group_names)].T
+        start += len(group_names)
+    singles = {name: data[:, index[name]] for name in signal_names or []}
+    return t, arrays, members, singles
+
+def deviation_from_mean(X):
+    # Deviation of every cell from the mean over the cells, (n_cells x n_samples)
+    return X - X.mean(axis=0)
+
+def imbalance(X):
+    # Spread max - min over the cells relative to the mean magnitude, per sample
+    mean = np.abs(X.mean(axis=0))
+    spread = X.max(axis=0) - X.min(axis=0)
+    return np.divide(spread, mean, out=np.full_like(spread, np.nan), where=mean > 0)
+
+def sharing_error(I):
+    # Share of every cell against an equal share of the total current, per sample
+    mean = I.mean(axis=0)
+    return np.divide(I - mean, np.abs(mean), out=np.full(I.shape, np.nan), where=np.abs(mean) > 0)
+
+def balancing_metrics(t, V, I=None, start_time=None, end_time=None):
+    """Cell balancing summary over a time window, all cells at once.
+
+    Returns per-cell RMS and peak deviation from the mean voltage, the peak
+    relative voltage imbalance over time and the time it occurs and, with I,
+    the per-cell RMS current sharing error and the peak current imbalance.
+    """
+    t = np.asarray(t, dtype=float)
+    start = 0 if start_time is None else int(np.searchsorted(t, start_time))
+    stop = len(t) if end_time is None else int(np.searchsorted(t, end_time))
+    V = V[:, start:stop]
+    deviation = deviation_from_mean(V)
+    voltage_imbalance = imbalance(V)
+    peak = int(np.nanargmax(voltage_imbalance)) if np.any(np.isfinite(voltage_imbalance)) else 0
+    metrics = {"v_deviation_rms": np.sqrt(np.mean(deviation ** 2, axis=1)),
+               "v_deviation_peak": np.max(np.abs(deviation), axis=1),
+               "v_imbalance_max": float(voltage_imbalance[peak]),
+               "v_imbalance_time": float(t[start + peak])}
+    if I is not None:
+        I = I[:, start:stop]
+        error = sharing_error(I)
+        metrics["i_sharing_error_rms"] = np.sqrt(np.nanmean(error ** 2, axis=1))
+        metrics["i_imbalance_max"] = float(np.nanmax(imbalance(I)))
+    return metrics
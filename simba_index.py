@@ -0,0 +1,204 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Indexed, lazily loaded reader for the jsimba project files
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import os, pathlib
+import hashlib
+import json
+import tempfile
+from simba_project import SCOPE_SIGNALS, subcircuit_definitions, walk_devices
+
+INDEX_VERSION = 1
+
+#%%  DECLARE FUNCTIONS
+
+def skip_whitespace(text, i):
+    while text[i] in " \t\r\n":
+        i += 1
+    return i
+
+def object_spans(text, i, decoder):
+    # (key, start, end, value) of the members of the JSON object starting at text[i]
+    spans = []
+    i = skip_whitespace(text, i) + 1
+    while True:
+        i = skip_whitespace(text, i)
+        if text[i] == "}":
+            return spans
+        key, i = decoder.raw_decode(text, i)
+        i = skip_whitespace(text, skip_whitespace(text, i) + 1)  # ':'
+        value, end = decoder.raw_decode(text, i)
+        spans.append((key, i, end, value))
+        i = skip_whitespace(text, end)
+        if text[i] == ",":
+            i += 1
+
+def array_spans(text, i, decoder):
+    # (start, end, value) of the elements of the JSON array starting at text[i]
+    spans = []
+    i = skip_whitespace(text, i) + 1
+    while True:
+        i = skip_whitespace(text, i)
+        if text[i] == "]":
+            return spans
+        value, end = decoder.raw_decode(text, i)
+        spans.append((i, end, value))
+        i = skip_whitespace(text, end)
+        if text[i] == ",":
+            i += 1
+
+def file_hash(filepath):
+    with open(filepath, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def build_index(filepath):
+    """Parse the project once and describe every design with byte offsets."""
+    with open(filepath, "rb") as f:
+        raw = f.read()
+    text = raw.decode("utf-8")
+    # byte offset of a character offset, identical for the ASCII files Simba writes
+    to_byte = (lambda i: i) if raw.isascii() else (lambda i: len(text[:i].encode("utf-8")))
+    decoder = json.JSONDecoder()
+    members = {key: (start, end, value) for key, start, end, value in object_spans(text, 0, decoder)}
+    project = {key: value for key, (start, end, value) in members.items()}
+    definitions = subcircuit_definitions(project)
+
+    # design hosting each subcircuit definition
+    hosts = {}
+    for design in project["Designs"]:
+        for definition_id in subcircuit_definitions(design):
+            hosts.setdefault(definition_id, design["Name"])
+
+    designs = {}
+    for start, end, design in array_spans(text, members["Designs"][0], decoder):
+        own = subcircuit_definitions(design)
+        subcircuits, probes, referenced = [], {}, set()
+        for path, device in walk_devices(design["Circuit"], definitions):
+            if device.get("SubcircuitDefinition") or device.get("SubcircuitDefinitionID"):
+                subcircuits.append(":".join(path))
+                definition_id = device.get("SubcircuitDefinitionID")
+                if definition_id in hosts and definition_id not in own:
+                    referenced.add(definition_id)
+            for scope in device.get("EnabledScopes") or []:
+                probes[":".join(path) + " - " + SCOPE_SIGNALS.get(scope, scope)] = device["LibraryName"]
+        designs[design["Name"]] = {
+            "offset": to_byte(start),
+            "length": to_byte(end) - to_byte(start),
+            "variables": {variable["Name"]: variable["Value"] for variable in design["Circuit"]["Variables"]},
+            "analysis": design["TransientAnalysis"],
+            "subcircuits": subcircuits,
+            "probes": probes,
+            "definitions": {definition_id: hosts[definition_id] for definition_id in sorted(referenced)},
+        }
+
+    thermal_data = {}
+    if "ThermalData" in members:
+        for start, end, data in array_spans(text, members["ThermalData"][0], decoder):
+            thermal_data[data["Name"]] = {"offset": to_byte(start), "length": to_byte(end) - to_byte(start)}
+
+    stat = os.stat(filepath)
+    return {"version": INDEX_VERSION, "mtime": stat.st_mtime, "size": stat.st_size,
+            "sha256": hashlib.sha256(raw).hexdigest(),
+            "designs": designs, "thermal_data": thermal_data}
+
+#%%  DECLARE CLASSES
+
+class ProjectIndex:
+    """Project reader backed by a sidecar index (<file>.index.json).
+
+    The index is reused while the file mtime and size are unchanged, or while
+    its sha256 still matches, and rebuilt otherwise. Listing designs,
+    variables, subcircuits and probes reads only the index. load_design()
+    seeks to one design and parses only its JSON subtree.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.index_path = filepath + ".index.json"
+        self.index = self.load_index()
+
+    def load_index(self):
+        stat = os.stat(self.filepath)
+        index = None
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, "r") as f:
+                index = json.load(f)
+            if index.get("version") != INDEX_VERSION:
+                index = None
+            elif index["mtime"] != stat.st_mtime or index["size"] != stat.st_size:
+                if index["sha256"] == file_hash(self.filepath):
+                    index["mtime"], index["size"] = stat.st_mtime, stat.st_size
+                    self.save_index(index)
+                else:
+                    index = None
+        if index is None:
+            print("-> Indexing " + self.filepath)
+            index = build_index(self.filepath)
+            self.save_index(index)
+        return index
+
+    def save_index(self, index):
+        # one tmp file per writer: spawned workers and nodes may rebuild the index at the same time,
+        # each replace publishes a complete index and the last one wins
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(self.index_path) + ".", suffix=".tmp",
+                                   dir=os.path.dirname(self.index_path) or ".")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp, self.index_path)
+        except OSError:
+            # the index is only a cache, the next run writes it again
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def design_names(self):
+        return list(self.index["designs"])
+
+    def design_info(self, design_name):
+        if design_name not in self.index["designs"]:
+            raise KeyError("design " + design_name + " not found in " + self.filepath)
+        return self.index["designs"][design_name]
+
+    def variables(self, design_name):
+        return dict(self.design_info(design_name)["variables"])
+
+    def analysis(self, design_name):
+        return dict(self.design_info(design_name)["analysis"])
+
+    def subcircuits(self, design_name):
+        return list(self.design_info(design_name)["subcircuits"])
+
+    def signals(self, design_name):
+        # Signal names of all enabled scopes, as accepted by job.GetSignalByName
+        return list(self.design_info(design_name)["probes"])
+
+    def resolve_signal(self, design_name, signal_name):
+        # Library name of the device behind a signal, KeyError for unknown signals
+        probes = self.design_info(design_name)["probes"]
+        if signal_name not in probes:
+            raise KeyError("signal " + signal_name + " not found in design " + design_name)
+        return probes[signal_name]
+
+    def read_span(self, span):
+        with open(self.filepath, "rb") as f:
+            f.seek(span["offset"])
+            return json.loads(f.read(span["length"]))
+
+    def load_design(self, design_name):
+        # JSON subtree of one design, without parsing the rest of the file
+        return self.read_span(self.design_info(design_name))
+
+    def load_project(self, design_names):
+        # Partial project holding the designs and the designs hosting their shared subcircuits
+        names = []
+        for design_name in design_names:
+            for name in [design_name] + list(self.design_info(design_name)["definitions"].values()):
+                if name not in names:
+                    names.append(name)
+        return {"Designs": [self.load_design(name) for name in names]}
+
+    def load_thermal_data(self, name):
+        return self.read_span(self.index["thermal_data"][name])
@@ -0,0 +1,107 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Vectorized step response KPIs over batches of sweep results
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import numpy as np
+
+#%%  DECLARE FUNCTIONS
+
+def stack_runs(t_arr, y_arr, time_step=None):
+    """Stack the runs of a sweep into one (n_runs x n_samples) array.
+
+    Runs sharing the same TimePoints are stacked as they are. Ragged runs
+    (other lengths or steps) are resampled by linear interpolation on a
+    common grid, from 0 to the shortest run end at time_step (default: the
+    smallest step of the runs). Returns t and the stacked array.
+    """
+    t_arr = [np.asarray(t, dtype=float) for t in t_arr]
+    if all(len(t) == len(t_arr[0]) and np.array_equal(t, t_arr[0]) for t in t_arr):
+        return t_arr[0], np.vstack([np.asarray(y, dtype=float) for y in y_arr])
+    if time_step is None:
+        time_step = min(float(np.min(np.diff(t))) for t in t_arr)
+    end = min(float(t[-1]) for t in t_arr)
+    t_grid = np.arange(int(np.floor(end / time_step + 1e-9)) + 1) * time_step
+    Y = np.empty((len(t_arr), len(t_grid)))
+    for k, (t, y) in enumerate(zip(t_arr, y_arr)):
+        Y[k] = np.interp(t_grid, t, y)
+    return t_grid, Y
+
+def first_true(mask):
+    # Index of the first True of every row, -1 when the row has none
+    index = np.argmax(mask, axis=1)
+    return np.where(mask.any(axis=1), index, -1)
+
+def last_true(mask):
+    # Index of the last True of every row, -1 when the row has none
+    index = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    return np.where(mask.any(axis=1), index, -1)
+
+def ripple_rms(t, Y, f_sw):
+    """RMS of the F_SW component of every row, over the whole periods at the end of t."""
+    period = 1.0 / f_sw
+    n_periods = int(np.floor((t[-1] - t[0]) / period))
+    if n_periods < 1:
+        return np.full(Y.shape[0], np.nan)
+    start = int(np.searchsorted(t, t[-1] - n_periods * period))
+    tail, t_tail = Y[:, start:], t[start:]
+    # single DFT bin at F_SW: amplitude 2|X|/N, rms amplitude/sqrt(2)
+    X = (tail - tail.mean(axis=1, keepdims=True)) @ np.exp(-2j * np.pi * f_sw * t_tail)
+    return np.sqrt(2) * np.abs(X) / tail.shape[1]
+
+def step_kpis(t, Y, step_time, end_time=None, setpoint=None, tolerance=0.02, rise=(0.1, 0.9), f_sw=None):
+    """Step response KPIs of every run in one pass.
+
+    Y is (n_runs x n_samples) on the time vector t, the response is judged
+    between step_time and end_time (default: end of t). The initial value is
+    the sample before the step, the final value the mean of the last 10 % of
+    the window. Returns a dict of (n_runs,) arrays: overshoot (relative to the
+    step size), rise_time (rise[0] to rise[1] of the step), settling_time
+    (last exit of the +/-tolerance band), steady_state_error (setpoint minus
+    final value, setpoint scalar or per run, nan without setpoint) and, with
+    f_sw, ripple_rms at F_SW over the window. Missing crossings give nan.
+    """
+    t = np.asarray(t, dtype=float)
+    Y = np.atleast_2d(np.asarray(Y, dtype=float))
+    start = int(np.searchsorted(t, step_time))
+    stop = len(t) if end_time is None else int(np.searchsorted(t, end_time))
+    segment, t_segment = Y[:, start:stop], t[start:stop]
+    initial = Y[:, max(start - 1, 0)]
+    final = segment[:, -max(segment.shape[1] // 10, 1):].mean(axis=1)
+    step = final - initial
+    size = np.abs(step)
+    valid = size > 0
+    # response normalised to 0 before and 1 after the step, per run
+    progress = (segment - initial[:, None]) / np.where(valid, step, 1.0)[:, None]
+
+    overshoot = np.where(valid, np.maximum(np.max(progress, axis=1) - 1.0, 0.0), 0.0)
+    low, high = first_true(progress >= rise[0]), first_true(progress >= rise[1])
+    rise_time = np.where((low >= 0) & (high >= 0) & valid, t_segment[high] - t_segment[low], np.nan)
+    outside = last_true(np.abs(segment - final[:, None]) > tolerance * size[:, None])
+    settling_time = np.where((outside >= 0) & valid, t_segment[outside] - step_time, 0.0)
+    if setpoint is None:
+        error = np.full(Y.shape[0], np.nan)
+    else:
+        error = np.asarray(setpoint, dtype=float) - final
+    kpis = {"initial": initial, "final": final, "overshoot": overshoot, "rise_time": rise_time,
+            "settling_time": settling_time, "steady_state_error": error}
+    if f_sw is not None:
+        kpis["ripple_rms"] = ripple_rms(t_segment, segment, f_sw)
+    return kpis
+
+def peak_current(t, I, current_limit, start_time=None, end_time=None):
+    """Peak absolute current of every run and its ratio to the current limit (scalar or per run)."""
+    t = np.asarray(t, dtype=float)
+    start = 0 if start_time is None else int(np.searchsorted(t, start_time))
+    stop = len(t) if end_time is None else int(np.searchsorted(t, end_time))
+    peak = np.max(np.abs(np.atleast_2d(I)[:, start:stop]), axis=1)
+    return peak, peak / np.asarray(current_limit, dtype=float)
+
+def print_kpis(labels, kpis):
+    # One line per run, one column per KPI
+    names = list(kpis)
+    print("run\t " + "\t ".join(names))
+    for k, label in enumerate(labels):
+        print(str(label) + "\t " + "\t ".join("%.4g" % kpis[name][k] for name in names))
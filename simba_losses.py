@@ -0,0 +1,221 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Semiconductor loss estimation from the ThermalData tables of a project
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import os, pathlib
+import numpy as np
+from simba_index import ProjectIndex
+
+# parsed tables, keyed by (project file, thermal data name, project sha256)
+MODELS = {}
+
+#%%  DECLARE FUNCTIONS
+
+def parse_table(serialized):
+    # '[760 4.7; 0 0]' -> (n x 2) array sorted on the current, with the origin added
+    rows = [row.split() for row in serialized.strip().strip("[]").split(";") if row.strip()]
+    table = np.array(rows, dtype=float).reshape(-1, 2)
+    if not np.any(table[:, 0] == 0.0):
+        table = np.vstack(([0.0, 0.0], table))
+    return table[np.argsort(table[:, 0], kind="stable")]
+
+def widen(axis, grid):
+    # A single point axis gets a second point with the same values, the grid is then constant along it
+    if len(axis) > 1:
+        return axis, grid
+    return np.array([axis[0], axis[0] + 1.0]), np.concatenate([grid, grid], axis=0)
+
+def curves_on_axis(tables, currents):
+    # Every (n x 2) curve linearly interpolated (and extrapolated) on the common current axis
+    rows = []
+    for table in tables:
+        x, y = widen(table[:, 0], table[:, 1])
+        slope = (y[-1] - y[-2]) / (x[-1] - x[-2])
+        rows.append(np.where(currents > x[-1], y[-1] + slope * (currents - x[-1]), np.interp(currents, x, y)))
+    return np.array(rows)
+
+def bilinear(x_axis, y_axis, grid, x, y):
+    """Bilinear interpolation of grid[len(y_axis), len(x_axis)] at the points (x, y).
+
+    x (the current) is extrapolated linearly beyond the last breakpoint, y is
+    clamped to its axis, y may be a scalar. Every cell is written as
+    a + b*x + c*y + d*x*y, so a lookup is one searchsorted and four takes.
+    """
+    x_axis, grid = widen(x_axis, grid.T)
+    y_axis, grid = widen(y_axis, grid.T)
+    x0, dx = x_axis[:-1], np.diff(x_axis)
+    y0, dy = y_axis[:-1, None], np.diff(y_axis)[:, None]
+    d = (grid[1:, 1:] - grid[1:, :-1] - grid[:-1, 1:] + grid[:-1, :-1]) / (dx * dy)
+    b = (grid[:-1, 1:] - grid[:-1, :-1]) / dx - d * y0
+    c = (grid[1:, :-1] - grid[:-1, :-1]) / dy - d * x0
+    a = grid[:-1, :-1] - b * x0 - c * y0 - d * x0 * y0
+    ix = np.searchsorted(x_axis[1:-1], x, side="right")
+    y = np.clip(y, y_axis[0], y_axis[-1])
+    if np.ndim(y) == 0:
+        # one row of cells: collapse it to a piecewise linear function of x
+        iy = int(np.searchsorted(y_axis[1:-1], y, side="right"))
+        return (a[iy] + c[iy] * y).take(ix) + (b[iy] + d[iy] * y).take(ix) * x
+    if y_axis.size == 2:
+        return a[0].take(ix) + (b[0].take(ix) + d[0].take(ix) * y) * x + c[0].take(ix) * y
+    cell = ix + (x_axis.size - 1) * np.searchsorted(y_axis[1:-1], y, side="right")
+    return a.ravel().take(cell) + (b.ravel().take(cell) + d.ravel().take(cell) * y) * x + c.ravel().take(cell) * y
+
+def load_loss_model(filepath, name):
+    # LossModel of one ThermalData entry, parsed once per project version
+    index = ProjectIndex(filepath)
+    key = (os.path.abspath(filepath), name, index.index["sha256"])
+    if key not in MODELS:
+        if name not in index.index["thermal_data"]:
+            raise KeyError("thermal data " + name + " not found in " + filepath)
+        MODELS[key] = LossModel(index.load_thermal_data(name))
+    return MODELS[key]
+
+def switching_events(signal, threshold=0.5):
+    # Indices of the first sample above (turn-on) and below (turn-off) threshold, e.g. of a gate or a device current
+    on = np.asarray(signal) > threshold
+    edges = np.flatnonzero(on[1:] != on[:-1]) + 1
+    return edges[on[edges]], edges[~on[edges]]
+
+def trapezoid_weights(t):
+    # w such that w @ y is the trapezoidal integral of y over t
+    w = np.empty(len(t))
+    w[1:-1] = 0.5 * (t[2:] - t[:-2])
+    w[0], w[-1] = 0.5 * (t[1] - t[0]), 0.5 * (t[-1] - t[-2])
+    return w
+
+def window(t, start_time=None, end_time=None):
+    start = 0 if start_time is None else int(np.searchsorted(t, start_time))
+    stop = len(t) if end_time is None else int(np.searchsorted(t, end_time, side="right"))
+    return start, stop
+
+def device_losses(t, i, v, model, temperature=125.0, events=None, f_sw=None, duty=1.0,
+                  start_time=None, end_time=None):
+    """Average conduction and switching losses [W] of one device over a window.
+
+    i is the device current (positive when the device conducts), v the
+    blocking voltage. Conduction is duty * i * V_on(i, temperature) where i > 0,
+    temperature may be a waveform. Switching losses come either from events,
+    (turn-on, turn-off) sample indices of a switched run (see
+    switching_events), with the energies taken at the current after turn-on /
+    before turn-off, or from f_sw for averaged runs: f_sw * (E_on + E_off) at
+    the instantaneous |i| and |v|. Returns a dict of average powers.
+    """
+    t, i, v = (np.asarray(x, dtype=float) for x in (t, i, v))
+    start, stop = window(t, start_time, end_time)
+    duration = t[stop - 1] - t[start]
+    i_w, v_w = i[start:stop], np.abs(v[start:stop])
+    temperature_w = np.asarray(temperature, dtype=float)[start:stop] if np.ndim(temperature) else temperature
+    # switching energies are looked up at one temperature, the mean of a temperature waveform
+    t_sw = float(np.mean(temperature_w))
+    w = trapezoid_weights(t[start:stop]) / duration
+    forward = np.maximum(i_w, 0.0)
+    losses = {"conduction": duty * float(w @ (forward * model.on_voltage(forward, temperature_w)))}
+    if events is not None:
+        on, off = (np.asarray(k) for k in events)
+        on = on[(on >= start) & (on < stop)]
+        off = off[(off > start) & (off < stop)]
+        losses["turn_on"] = float(np.sum(model.turn_on_energy(np.abs(i[on]), np.abs(v[on - 1]), t_sw)) / duration)
+        losses["turn_off"] = float(np.sum(model.turn_off_energy(np.abs(i[off - 1]), np.abs(v[off]), t_sw)) / duration)
+    elif f_sw is not None:
+        i_abs = np.abs(i_w)
+        losses["turn_on"] = f_sw * float(w @ model.turn_on_energy(i_abs, v_w, t_sw))
+        losses["turn_off"] = f_sw * float(w @ model.turn_off_energy(i_abs, v_w, t_sw))
+    losses["total"] = sum(losses.values())
+    return losses
+
+#%%  DECLARE CLASSES
+
+class LossModel:
+    """Lookup grids of one ThermalData entry.
+
+    Conduction: on-state voltage over (temperature x current), from the
+    'IVSerialized' curves ([current voltage; ...]). Switching: turn-on and
+    turn-off energies over (temperature x voltage x current), from the
+    'EISerialized' curves ([current energy; ...]), curves missing at some
+    (temperature, voltage) pairs are filled by interpolation over the
+    temperature. Outside the voltage axis the energy is scaled by the
+    voltage ratio, so a single voltage curve scales linearly.
+    """
+
+    def __init__(self, data):
+        self.name = data["Name"]
+        self.conduction = self.iv_grid(data["ConductionLosses"])
+        self.turn_on = self.ei_grid(data["TurnOnLosses"])
+        self.turn_off = self.ei_grid(data["TurnOffLosses"])
+
+    @staticmethod
+    def iv_grid(entries):
+        entries = sorted(entries, key=lambda entry: entry["Temperature"])
+        tables = [parse_table(entry["IVSerialized"]) for entry in entries]
+        currents = np.unique(np.concatenate([table[:, 0] for table in tables]))
+        temperatures = np.array([entry["Temperature"] for entry in entries], dtype=float)
+        return temperatures, currents, curves_on_axis(tables, currents)
+
+    @staticmethod
+    def ei_grid(entries):
+        tables = [parse_table(entry["EISerialized"]) for entry in entries]
+        currents = np.unique(np.concatenate([table[:, 0] for table in tables]))
+        curves = curves_on_axis(tables, currents)
+        temperatures = np.unique([float(entry["Temperature"]) for entry in entries])
+        voltages = np.unique([float(entry["Voltage"]) for entry in entries])
+        grid = np.empty((len(temperatures), len(voltages), len(currents)))
+        for j, voltage in enumerate(voltages):
+            rows = [k for k, entry in enumerate(entries) if float(entry["Voltage"]) == voltage]
+            rows.sort(key=lambda k: entries[k]["Temperature"])
+            t_rows = np.array([entries[k]["Temperature"] for k in rows], dtype=float)
+            for n in range(len(currents)):
+                grid[:, j, n] = np.interp(temperatures, t_rows, curves[rows, n])
+        return temperatures, voltages, currents, grid
+
+    def on_voltage(self, i, temperature):
+        temperatures, currents, grid = self.conduction
+        return bilinear(currents, temperatures, grid, i, temperature)
+
+    def energy(self, table, i, v, temperature):
+        temperatures, voltages, currents, grid = table
+        # collapse the temperature axis first, then one bilinear pass over (voltage x current)
+        at_temperature = np.apply_along_axis(lambda column: np.interp(temperature, temperatures, column), 0, grid)
+        if voltages.size == 1:
+            # single voltage curve: a function of the current only, scaled by the voltage ratio
+            return bilinear(currents, voltages, at_temperature, i, voltages[0]) * (v / voltages[0])
+        clamped = np.clip(v, voltages[0], voltages[-1])
+        return bilinear(currents, voltages, at_temperature, i, clamped) * (v / clamped)
+
+    def turn_on_energy(self, i, v, temperature=125.0):
+        return self.energy(self.turn_on, i, v, temperature)
+
+    def turn_off_energy(self, i, v, temperature=125.0):
+        return self.energy(self.turn_off, i, v, temperature)
+
+#%%  Secondary bridge losses of the switched and averaged SST models
+if __name__ == "__main__":
+    import time
+    from simba_sweep import run_point
+    filepath = os.path.join(pathlib.Path().absolute(), "SST_Switched_Model.jsimba")
+    f_sw = float(ProjectIndex(filepath).variables("System level SST Block")["F_SW"])
+    igbt, diode = load_loss_model(filepath, "IGBT_DATA_2"), load_loss_model(filepath, "DIODE_DATA_2")
+    # design: (device current, blocking voltage, switched model)
+    runs = {"Semiconductor level Blocks - Voltage Control": (['CP3 - Instantaneous Current', 'C1 - Instantaneous Voltage'], True),
+            "System level SST Block": (['Sc4:Sc1:I_SEC - Instantaneous Current', 'Sc4:Sc1:V_SEC - Instantaneous Voltage'], False)}
+    for design_name, (signal_names, switched) in runs.items():
+        t, (i, v) = run_point(filepath, design_name, {}, signal_names)
+        start = time.perf_counter()
+        # each of the 4 switch positions conducts half of the period, the IGBT in one current direction, the diode in the other
+        currents = {"IGBT": (i, igbt), "Diode": (-i, diode)}
+        if switched:
+            # switched run: energies at the actual commutations, the design has no gate probe,
+            # so a device turns on and off when the current of its position changes sign
+            threshold = 0.01 * float(np.max(np.abs(i)))
+            losses = {device: device_losses(t, current, v, model, 125.0, events=switching_events(current, threshold), duty=0.5)
+                      for device, (current, model) in currents.items()}
+        else:
+            # averaged run: no commutation in the waveforms, f_sw * (E_on + E_off) at the instantaneous operating point
+            losses = {device: device_losses(t, current, v, model, 125.0, f_sw=f_sw, duty=0.5)
+                      for device, (current, model) in currents.items()}
+        elapsed = time.perf_counter() - start
+        print("-> " + design_name + ": " + str(len(t)) + " samples, losses in " + "%.1f" % (elapsed * 1e3) + " ms")
+        for device, values in losses.items():
+            print(device + "\t " + "\t ".join(name + " %.1f W" % value for name, value in values.items()))
@@ -0,0 +1,192 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Parallel Monte Carlo tolerance analysis with streaming statistics
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import multiprocessing
+import os, pathlib
+import numpy as np
+from simba_index import ProjectIndex
+from simba_sweep import run_config
+from simba_overrides import DesignTemplate
+
+#%%  DECLARE FUNCTIONS
+
+def sample_variables(nominal, tolerances, n_runs, seed=None, distribution="uniform"):
+    """Draw n_runs variable sets around the nominal values.
+
+    tolerances maps a variable to its relative tolerance (0.1 for +/-10 %).
+    uniform draws in [1 - tol, 1 + tol], normal uses tol as 3 sigma, clipped
+    to the same band. Returns a list of dicts name -> value.
+    """
+    rng = np.random.default_rng(seed)
+    names = list(tolerances)
+    tol = np.array([tolerances[name] for name in names])
+    if distribution == "uniform":
+        factors = rng.uniform(1 - tol, 1 + tol, size=(n_runs, len(names)))
+    elif distribution == "normal":
+        factors = np.clip(rng.normal(1.0, tol / 3, size=(n_runs, len(names))), 1 - tol, 1 + tol)
+    else:
+        raise ValueError("unknown distribution " + distribution)
+    values = factors * np.array([float(nominal[name]) for name in names])
+    return [dict(zip(names, row.tolist())) for row in values]
+
+#%%  DECLARE CLASSES
+
+class P2Quantile:
+    """P-square estimate of one quantile for every element of an array stream.
+
+    Five markers per element (Jain and Chlamtac), updated with array
+    operations only, so memory does not depend on the number of runs.
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self.count = 0
+        self.initial = []
+        self.dn = np.array([0.0, p / 2, p, (1 + p) / 2, 1.0])
+
+    def update(self, x):
+        x = np.asarray(x, dtype=float).ravel()
+        self.count += 1
+        if self.count <= 5:
+            self.initial.append(x.copy())
+            if self.count == 5:
+                self.q = np.sort(np.array(self.initial), axis=0)
+                self.n = np.tile(np.arange(1.0, 6.0)[:, None], (1, len(x)))
+                self.desired = 1 + 4 * self.dn
+                self.initial = None
+            return
+        q, n = self.q, self.n
+        # cell of x, extreme markers follow the new min / max
+        k = (x[None, :] >= q[1:4]).sum(axis=0)
+        q[0] = np.minimum(q[0], x)
+        q[4] = np.maximum(q[4], x)
+        n[1:] += np.arange(1, 5)[:, None] > k[None, :]
+        self.desired += self.dn
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for i in range(1, 4):
+                d = self.desired[i] - n[i]
+                move = ((d >= 1) & (n[i + 1] - n[i] > 1)) | ((d <= -1) & (n[i - 1] - n[i] < -1))
+                if not move.any():
+                    continue
+                s = np.sign(d)
+                parabolic = q[i] + s / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + s) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+                    (n[i + 1] - n[i] - s) * (q[i] - q[i - 1]) / (n[i] - n[i - 1]))
+                q_next = np.where(s > 0, q[i + 1], q[i - 1])
+                n_next = np.where(s > 0, n[i + 1], n[i - 1])
+                linear = q[i] + s * (q_next - q[i]) / (n_next - n[i])
+                inside = (q[i - 1] < parabolic) & (parabolic < q[i + 1])
+                q[i] = np.where(move, np.where(inside, parabolic, linear), q[i])
+                n[i] = np.where(move, n[i] + s, n[i])
+
+    def value(self):
+        if self.count >= 5:
+            return self.q[2].copy()
+        return np.quantile(np.array(self.initial), self.p, axis=0)
+
+class StreamingStats:
+    """Per-sample statistics of a stream of (n_signals x n_samples) runs.
+
+    Mean and variance (Welford), min/max envelopes and P-square quantiles
+    are updated run by run. Memory is set by the grid, not by the number
+    of runs.
+    """
+
+    def __init__(self, shape, quantiles=(0.05, 0.5, 0.95)):
+        self.shape = shape
+        self.count = 0
+        self.mean = np.zeros(shape)
+        self.m2 = np.zeros(shape)
+        self.minimum = np.full(shape, np.inf)
+        self.maximum = np.full(shape, -np.inf)
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+
+    def update(self, Y):
+        self.count += 1
+        delta = Y - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (Y - self.mean)
+        np.minimum(self.minimum, Y, out=self.minimum)
+        np.maximum(self.maximum, Y, out=self.maximum)
+        for estimator in self.quantiles.values():
+            estimator.update(Y)
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else np.zeros(self.shape)
+
+    def std(self):
+        return np.sqrt(self.variance())
+
+    def quantile(self, p):
+        return self.quantiles[p].value().reshape(self.shape)
+
+#%%  DECLARE FUNCTIONS
+
+def run_montecarlo(filepath, design_name, tolerances, n_runs, signal_names, n_grid=2000, kpis=None, seed=None,
+                   distribution="uniform", processes=None, cache_dir=None):
+    """Run n_runs tolerance samples of a design over a pool and fold them into StreamingStats.
+
+    Every finished run is resampled on a common grid of n_grid points over
+    EndTime, folded into the statistics and dropped. At most two runs per
+    process are in flight. kpis(t, signals) may return a dict of scalars per
+    run; the distributions are returned as arrays in sample order. Returns
+    t_grid, the statistics, the sampled variable sets and the KPI arrays.
+    """
+    template = DesignTemplate(filepath, design_name)
+    samples = sample_variables(template.variables, tolerances, n_runs, seed, distribution)
+    configs = template.configure_many(samples)
+    t_grid = np.linspace(0.0, float(ProjectIndex(filepath).analysis(design_name)["EndTime"]), n_grid)
+    stats = StreamingStats((len(signal_names), n_grid))
+    kpi_values = {}
+    processes = max(1, min(processes or os.cpu_count() or 1, n_runs))
+    print("-> Monte Carlo " + design_name + ": " + str(n_runs) + " runs, " + str(processes) + " processes")
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        pending, submitted = {}, 0
+        while submitted < n_runs or pending:
+            while submitted < n_runs and len(pending) < 2 * processes:
+                future = executor.submit(run_config, configs[submitted], signal_names, cache_dir)
+                pending[future] = submitted
+                submitted += 1
+            done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                run = pending.pop(future)
+                t, signals = future.result()
+                stats.update(np.vstack([np.interp(t_grid, t, y) for y in signals]))
+                if kpis is not None:
+                    for name, value in kpis(t, dict(zip(signal_names, signals))).items():
+                        kpi_values.setdefault(name, np.full(n_runs, np.nan))[run] = value
+            print("-> " + str(stats.count) + "/" + str(n_runs) + " runs")
+    return t_grid, stats, samples, kpi_values
+
+#%%  Tolerance study of model 3 (component values +/-10-20 %)
+if __name__ == "__main__":
+    import matplotlib.pyplot as plt
+    filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
+    tolerances = {"L_LEAK": 0.2, "C_DC": 0.2, "C_AFE": 0.2, "L_DCBUS": 0.1, "R_DCBUS": 0.1}
+    signal_names = ['Sc1:Sc1:V_SEC - Instantaneous Voltage', 'Sc3:V_AFE - Instantaneous Voltage']
+    kpis = lambda t, signals: {"V_SEC_max": float(np.max(signals[signal_names[0]])),
+                               "V_AFE_min": float(np.min(signals[signal_names[1]]))}
+    t_grid, stats, samples, kpi_values = run_montecarlo(filepath, "3 Single SST with BESS and AFE", tolerances, 200,
+                                                        signal_names, kpis=kpis, seed=1,
+                                                        cache_dir=os.path.join(pathlib.Path().absolute(), ".simba_cache"))
+    for name, values in kpi_values.items():
+        print(name + "\t mean: " + str(np.nanmean(values)) + "\t 5%: " + str(np.nanquantile(values, 0.05)) +
+              "\t 95%: " + str(np.nanquantile(values, 0.95)))
+
+    fig1, axes = plt.subplots(len(signal_names), 1, sharex=True)
+    axes[0].set_title('Monte Carlo - ' + str(stats.count) + ' runs')
+    for k, ax in enumerate(axes):
+        ax.fill_between(t_grid, stats.minimum[k], stats.maximum[k], alpha=0.2, label='min/max')
+        ax.fill_between(t_grid, stats.quantile(0.05)[k], stats.quantile(0.95)[k], alpha=0.4, label='5-95 %')
+        ax.plot(t_grid, stats.mean[k], label='mean')
+        ax.set_ylabel(signal_names[k].split(' - ')[0])
+        ax.grid(True)
+        ax.legend(loc='lower left')
+    axes[-1].set_xlabel('time [s]')
+    plt.show()
@@ -0,0 +1,106 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Immutable design templates and validated per-run variable overrides
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from collections import namedtuple
+import math
+import numbers
+from types import MappingProxyType
+from simba_index import ProjectIndex
+
+#%%  DECLARE FUNCTIONS
+
+def parse_value(value):
+    # Typed value of a design variable: float when numeric, the string otherwise
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return str(value)
+
+def format_value(value):
+    # String assigned to variable.Value
+    return repr(value) if isinstance(value, float) else str(value)
+
+#%%  DECLARE CLASSES
+
+class RunConfig(namedtuple("RunConfig", ["filepath", "design_name", "overrides"])):
+    """One run of a design: the project, the design name and its validated overrides.
+
+    overrides is a sorted tuple of (name, typed value) pairs, so a RunConfig is
+    immutable, hashable and cheap to send to a worker process.
+    """
+    __slots__ = ()
+
+    def values(self):
+        # Overrides as the strings assigned to the Simba variables
+        return {name: format_value(value) for name, value in self.overrides}
+
+class DesignTemplate:
+    """Read-only base of a design with typed variable overrides on top.
+
+    The variables are read once from the project index into a name -> typed
+    value mapping (O(1) lookups), the design itself is never modified here.
+    configure() validates a dict of overrides against that mapping and
+    returns a RunConfig, run_config() in simba_sweep applies it on the
+    design of a worker and restores the design afterwards.
+    """
+
+    def __init__(self, filepath, design_name):
+        variables = ProjectIndex(filepath).variables(design_name)
+        self._filepath = filepath
+        self._design_name = design_name
+        self._variables = MappingProxyType({name: parse_value(value) for name, value in variables.items()})
+
+    @property
+    def filepath(self):
+        return self._filepath
+
+    @property
+    def design_name(self):
+        return self._design_name
+
+    @property
+    def variables(self):
+        return self._variables
+
+    def validate(self, overrides):
+        """Typed copy of overrides, KeyError for unknown names, ValueError for bad values.
+
+        Numeric variables accept real numbers and numeric strings and must be
+        finite, other variables accept strings.
+        """
+        typed = {}
+        for name, value in overrides.items():
+            if name not in self._variables:
+                raise KeyError("variable " + name + " not found in design " + self._design_name)
+            if isinstance(self._variables[name], float):
+                if isinstance(value, bool) or not isinstance(value, (numbers.Real, str)):
+                    raise ValueError("variable " + name + " expects a number, got " + repr(value))
+                number = parse_value(value)
+                if not isinstance(number, float) or not math.isfinite(number):
+                    raise ValueError("variable " + name + " expects a finite number, got " + repr(value))
+                typed[name] = number
+            elif isinstance(value, str):
+                typed[name] = value
+            else:
+                raise ValueError("variable " + name + " expects a string, got " + repr(value))
+        return typed
+
+    def configure(self, overrides=None):
+        typed = self.validate(overrides or {})
+        return RunConfig(self._filepath, self._design_name, tuple(sorted(typed.items())))
+
+    def configure_many(self, overrides_list):
+        # All configurations are validated before any is returned
+        return [self.configure(overrides) for overrides in overrides_list]
+
+    def value(self, name, config=None):
+        # Value of a variable in a run, the base value when config does not override it
+        if config is not None:
+            overrides = dict(config.overrides)
+            if name in overrides:
+                return overrides[name]
+        return self._variables[name]
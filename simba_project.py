@@ -0,0 +1,64 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Read the jsimba project files without the Simba runtime
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import json
+
+#%%  Scope names as they appear in the job signal names ('Sc1:Sc1:V_SEC - Instantaneous Voltage')
+SCOPE_SIGNALS = {"Voltage": "Instantaneous Voltage",
+                 "Current": "Instantaneous Current"}
+
+#%%  DECLARE FUNCTIONS
+
+def load_project(filepath):
+    with open(filepath, "r") as f:
+        return json.load(f)
+
+def get_design(project, design_name):
+    for design in project["Designs"]:
+        if design["Name"] == design_name:
+            return design
+    raise KeyError("design " + design_name + " not found")
+
+def subcircuit_definitions(node, definitions=None):
+    # Subcircuit definitions by Id, a device may reuse a definition stored in another design
+    if definitions is None:
+        definitions = {}
+    if isinstance(node, dict):
+        definition = node.get("SubcircuitDefinition")
+        if definition:
+            definitions.setdefault(definition["Id"], definition)
+        for value in node.values():
+            subcircuit_definitions(value, definitions)
+    elif isinstance(node, list):
+        for value in node:
+            subcircuit_definitions(value, definitions)
+    return definitions
+
+def device_definition(device, definitions):
+    # Subcircuit content of a device, inline or referenced by SubcircuitDefinitionID
+    definition = device.get("SubcircuitDefinition")
+    if not definition and device.get("SubcircuitDefinitionID"):
+        definition = definitions.get(device["SubcircuitDefinitionID"])
+    return definition
+
+def walk_devices(circuit, definitions, path=()):
+    # Yield (path, device) for every device of the circuit and of its subcircuits
+    for device in circuit["Devices"]:
+        device_path = path + (device["Name"],)
+        yield device_path, device
+        definition = device_definition(device, definitions)
+        if definition:
+            yield from walk_devices(definition, definitions, device_path)
+
+def referenced_definitions(project, design_name):
+    # Subcircuit definitions used by a design but stored outside of its JSON subtree
+    definitions = subcircuit_definitions(project)
+    referenced = {}
+    for path, device in walk_devices(get_design(project, design_name)["Circuit"], definitions):
+        if not device.get("SubcircuitDefinition") and device.get("SubcircuitDefinitionID") in definitions:
+            referenced[device["SubcircuitDefinitionID"]] = definitions[device["SubcircuitDefinitionID"]]
+    return referenced
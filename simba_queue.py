@@ -0,0 +1,316 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Resumable sweep campaigns on a SQLite job table shared by several nodes
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+# Usage (the database and the result directory on the shared filesystem):
+#   python simba_queue.py --db /shared/tuning.sqlite add ki_sweep "1 Single SST Current CTRL" \
+#       --grid KI_I=500,1000,2000,5000 --grid KP_I=0.05,0.072,0.1 --signal "Sc1:Sc1:I_SEC - Instantaneous Current"
+#   python simba_queue.py --db /shared/tuning.sqlite work --results /shared/results --processes 8   (on every node)
+#   python simba_queue.py --db /shared/tuning.sqlite status
+# Adding the same sweep again only inserts the missing points, restarting the workers only runs the points
+# not done yet. Jobs of a dead worker go back to the queue once their lease expires.
+
+#%%  Load required module
+import argparse
+import itertools
+import json
+import multiprocessing
+import os, pathlib
+import shutil
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+from simba_cli import parse_assignments
+from simba_overrides import DesignTemplate, RunConfig
+from simba_store import write_result
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS campaigns (
+    name TEXT PRIMARY KEY,
+    filepath TEXT NOT NULL,
+    design TEXT NOT NULL,
+    signals TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    campaign TEXT NOT NULL REFERENCES campaigns(name),
+    overrides TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    updated REAL,
+    UNIQUE (campaign, overrides)
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, lease_until);
+"""
+
+#%%  DECLARE FUNCTIONS
+
+def expand_grid(grid, fixed_values=None):
+    # {name: [values]} -> one dict per point of the cartesian product, first name varying slowest
+    names = list(grid)
+    return [dict(fixed_values or {}, **dict(zip(names, point))) for point in itertools.product(*grid.values())]
+
+def worker_name():
+    return socket.gethostname() + ":" + str(os.getpid())
+
+#%%  DECLARE CLASSES
+
+class JobQueue:
+    """Sweep points of named campaigns as rows of a SQLite table.
+
+    Every state change is one short transaction. claim() runs under BEGIN
+    IMMEDIATE, so two workers never get the same row, and first returns to
+    the queue the running rows whose lease expired (dead worker). A job is
+    retried up to max_attempts times, then marked failed. The database
+    relies on the file locks of the shared filesystem, and lease times on
+    the clocks of the nodes being roughly in sync.
+    """
+
+    def __init__(self, db_path, max_attempts=3):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.connection = sqlite3.connect(db_path, timeout=60.0, isolation_level=None)
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def transaction(self, statements):
+        # statements(cursor) runs inside BEGIN IMMEDIATE ... COMMIT, its return value is passed through
+        cursor = self.connection.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            result = statements(cursor)
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+        return result
+
+    def add_sweep(self, campaign, filepath, design_name, grid, signal_names, fixed_values=None):
+        """Insert the points of a variable grid, returns the number of new jobs.
+
+        Every point is validated against the design variables first. Points
+        already in the campaign are skipped, so adding a sweep again only
+        queues what is missing.
+        """
+        filepath = os.path.abspath(filepath)
+        template = DesignTemplate(filepath, design_name)
+        configs = template.configure_many(expand_grid(grid, fixed_values))
+        rows = [(campaign, json.dumps(config.overrides)) for config in configs]
+
+        def insert(cursor):
+            known = cursor.execute("SELECT filepath, design, signals FROM campaigns WHERE name = ?", (campaign,)).fetchone()
+            if known is None:
+                cursor.execute("INSERT INTO campaigns VALUES (?, ?, ?, ?)",
+                               (campaign, filepath, design_name, json.dumps(list(signal_names))))
+            elif known != (filepath, design_name, json.dumps(list(signal_names))):
+                raise ValueError("campaign " + campaign + " already exists for another design or signal set")
+            before = self.connection.total_changes
+            cursor.executemany("INSERT OR IGNORE INTO jobs (campaign, overrides) VALUES (?, ?)", rows)
+            return self.connection.total_changes - before
+        return self.transaction(insert)
+
+    def claim(self, worker, lease=600.0):
+        """Lease the next pending job to worker, None when nothing is pending.
+
+        Returns (job id, campaign, RunConfig, signal names).
+        """
+        def take(cursor):
+            now = time.time()
+            # a worker that died on the job counts as an attempt, after max_attempts the job is failed
+            cursor.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                           "error = CASE WHEN attempts >= ? THEN 'lease expired' ELSE error END, "
+                           "worker = NULL, lease_until = NULL, updated = ? WHERE status = 'running' AND lease_until < ?",
+                           (self.max_attempts, self.max_attempts, now, now))
+            row = cursor.execute("SELECT jobs.id, jobs.campaign, jobs.overrides, campaigns.filepath, campaigns.design, "
+                                 "campaigns.signals FROM jobs JOIN campaigns ON jobs.campaign = campaigns.name "
+                                 "WHERE jobs.status = 'pending' ORDER BY jobs.id LIMIT 1").fetchone()
+            if row is None:
+                return None
+            cursor.execute("UPDATE jobs SET status = 'running', worker = ?, lease_until = ?, attempts = attempts + 1, "
+                           "updated = ? WHERE id = ?", (worker, now + lease, now, row[0]))
+            return row
+        row = self.transaction(take)
+        if row is None:
+            return None
+        job_id, campaign, overrides, filepath, design_name, signals = row
+        config = RunConfig(filepath, design_name, tuple(tuple(pair) for pair in json.loads(overrides)))
+        return job_id, campaign, config, json.loads(signals)
+
+    def renew(self, job_id, worker, lease=600.0):
+        # Extend the lease of a running job, False when the worker lost it
+        cursor = self.connection.execute("UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                                         (time.time() + lease, job_id, worker))
+        return cursor.rowcount == 1
+
+    def complete(self, job_id, result):
+        # A job run twice (lease expired while it was still running) keeps the first result
+        self.connection.execute("UPDATE jobs SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated = ? "
+                                "WHERE id = ? AND status != 'done'", (result, time.time(), job_id))
+
+    def fail(self, job_id, worker, error):
+        # Back to the queue for another attempt, failed after max_attempts
+        self.connection.execute("UPDATE jobs SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                                "worker = NULL, lease_until = NULL, error = ?, updated = ? "
+                                "WHERE id = ? AND worker = ? AND status = 'running'",
+                                (self.max_attempts, error, time.time(), job_id, worker))
+
+    def retry_failed(self, campaign=None):
+        # Give the failed jobs a new set of attempts, returns their number
+        query = "UPDATE jobs SET status = 'pending', attempts = 0 WHERE status = 'failed'"
+        cursor = self.connection.execute(query + (" AND campaign = ?" if campaign else ""), (campaign,) if campaign else ())
+        return cursor.rowcount
+
+    def status(self):
+        # {campaign: {status: count}}
+        counts = {}
+        for campaign, status, count in self.connection.execute(
+                "SELECT campaign, status, COUNT(*) FROM jobs GROUP BY campaign, status ORDER BY campaign"):
+            counts.setdefault(campaign, {})[status] = count
+        return counts
+
+    def results(self, campaign):
+        # (overrides, result store directory) of the finished jobs of a campaign, in insertion order
+        rows = self.connection.execute("SELECT overrides, result FROM jobs WHERE campaign = ? AND status = 'done' "
+                                       "ORDER BY id", (campaign,))
+        return [(dict(json.loads(overrides)), result) for overrides, result in rows]
+
+class Heartbeat(threading.Thread):
+    """Renew the lease of the running job every lease / 3 seconds (own connection, own thread)."""
+
+    def __init__(self, db_path, job_id, worker, lease):
+        super().__init__(daemon=True)
+        self.db_path = db_path
+        self.job_id = job_id
+        self.worker = worker
+        self.lease = lease
+        self.stop_event = threading.Event()
+
+    def run(self):
+        queue = JobQueue(self.db_path)
+        try:
+            while not self.stop_event.wait(self.lease / 3):
+                if not queue.renew(self.job_id, self.worker, self.lease):
+                    return
+        finally:
+            queue.close()
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+#%%  DECLARE FUNCTIONS
+
+def store_result(result_dir, campaign, job_id, t, signal_names, signals, metadata):
+    # Write to a private directory, then rename it in place: readers never see a partial result
+    final = os.path.join(result_dir, campaign, "job_" + str(job_id))
+    tmp = final + "." + worker_name().replace(":", "_") + ".tmp"
+    write_result(tmp, t, signal_names, signals, metadata)
+    try:
+        os.rename(tmp, final)
+    except OSError:
+        # the same job finished on another worker first
+        shutil.rmtree(tmp, ignore_errors=True)
+    return final
+
+def run_worker(db_path, result_dir, lease=600.0, cache_dir=None, poll=5.0):
+    """Claim and run jobs until no job is pending or running anywhere.
+
+    While other workers still hold leases, the worker keeps polling so it can
+    pick up their jobs if they die. Returns the number of jobs it completed.
+    """
+    from simba_sweep import run_config
+    queue = JobQueue(db_path)
+    worker = worker_name()
+    done = 0
+    try:
+        while True:
+            job = queue.claim(worker, lease)
+            if job is None:
+                if not any(counts.get("running") for counts in queue.status().values()):
+                    return done
+                time.sleep(poll)
+                continue
+            job_id, campaign, config, signal_names = job
+            print("-> " + worker + " job " + str(job_id) + " " + str(config.values()))
+            heartbeat = Heartbeat(db_path, job_id, worker, lease)
+            heartbeat.start()
+            try:
+                start = time.perf_counter()
+                t, signals = run_config(config, signal_names, cache_dir)
+                metadata = {"file": os.path.basename(config.filepath), "design": config.design_name,
+                            "campaign": campaign, "variables": config.values(), "worker": worker,
+                            "solver_s": time.perf_counter() - start}
+                result = store_result(result_dir, campaign, job_id, t, signal_names, signals, metadata)
+            except Exception:
+                heartbeat.stop()
+                queue.fail(job_id, worker, traceback.format_exc())
+                print("-> " + worker + " job " + str(job_id) + " failed")
+                continue
+            heartbeat.stop()
+            queue.complete(job_id, result)
+            done += 1
+    finally:
+        queue.close()
+
+def run_workers(db_path, result_dir, processes=None, lease=600.0, cache_dir=None):
+    # processes worker loops on this node, each opens the project once and keeps it for all its jobs
+    processes = processes or os.cpu_count() or 1
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=run_worker, args=(db_path, result_dir, lease, cache_dir))
+               for k in range(processes)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join()
+
+def print_status(queue):
+    for campaign, counts in queue.status().items():
+        total = sum(counts.values())
+        print(campaign + "\t " + str(counts.get("done", 0)) + "/" + str(total) + " done\t " +
+              "\t ".join(status + ": " + str(count) for status, count in sorted(counts.items()) if status != "done"))
+
+#%%  Command line: add, work, status
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep campaigns on a SQLite job table shared by several nodes")
+    parser.add_argument("--db", required=True, help="SQLite database on the shared filesystem")
+    commands = parser.add_subparsers(dest="command", required=True)
+    add_parser = commands.add_parser("add", help="queue the missing points of a sweep")
+    add_parser.add_argument("campaign")
+    add_parser.add_argument("design")
+    add_parser.add_argument("--file", default=os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba"))
+    add_parser.add_argument("--grid", action="append", required=True, metavar="NAME=V1,V2,...", help="swept variable (repeatable)")
+    add_parser.add_argument("--set", action="append", metavar="NAME=VALUE", help="fixed variable override (repeatable)")
+    add_parser.add_argument("--signal", action="append", required=True, help="signal to store (repeatable)")
+    work_parser = commands.add_parser("work", help="run jobs on this node until the queue is empty")
+    work_parser.add_argument("--results", required=True, help="shared result directory")
+    work_parser.add_argument("--processes", type=int)
+    work_parser.add_argument("--lease", type=float, default=600.0, help="seconds before the job of a silent worker is requeued")
+    work_parser.add_argument("--cache", help="result cache directory")
+    status_parser = commands.add_parser("status", help="progress of every campaign")
+    status_parser.add_argument("--retry-failed", action="store_true", help="queue the failed jobs again")
+    args = parser.parse_args()
+
+    if args.command == "add":
+        grid = {name: values.split(",") for name, values in parse_assignments(args.grid).items()}
+        queue = JobQueue(args.db)
+        added = queue.add_sweep(args.campaign, args.file, args.design, grid, args.signal, parse_assignments(args.set))
+        print("-> " + str(added) + " new jobs in " + args.campaign)
+        print_status(queue)
+    elif args.command == "work":
+        run_workers(args.db, args.results, args.processes, args.lease, args.cache)
+        print_status(JobQueue(args.db))
+    else:
+        queue = JobQueue(args.db)
+        if args.retry_failed:
+            print("-> " + str(queue.retry_failed()) + " failed jobs queued again")
+        print_status(queue)
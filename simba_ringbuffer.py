@@ -0,0 +1,49 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Fixed capacity ring buffer for the continuous time display
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import numpy as np
+
+#%%  DECLARE CLASSES
+
+class RingBuffer:
+    """Preallocated (channels x samples) buffer keeping the latest capacity samples.
+
+    The storage is twice the capacity and each chunk is written at its position
+    and again capacity samples further, so the latest samples are always one
+    contiguous slice. view() returns that slice without copying.
+    """
+
+    def __init__(self, n_channels, capacity, dtype=np.float64):
+        self.capacity = capacity
+        self.data = np.zeros((n_channels, 2 * capacity), dtype=dtype)
+        self.head = 0       # next write position, in [0, capacity)
+        self.count = 0      # number of valid samples
+
+    def write(self, block):
+        # Bulk write a (channels x n) chunk with slice assignments, no per-sample loop
+        n = block.shape[1]
+        if n >= self.capacity:
+            block = block[:, n - self.capacity:]
+            n = self.capacity
+        first = min(n, self.capacity - self.head)
+        self.data[:, self.head:self.head + first] = block[:, :first]
+        self.data[:, self.head + self.capacity:self.head + self.capacity + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            self.data[:, :rest] = block[:, first:]
+            self.data[:, self.capacity:self.capacity + rest] = block[:, first:]
+        self.head = (self.head + n) % self.capacity
+        self.count = min(self.count + n, self.capacity)
+
+    def view(self):
+        # Latest samples of all channels, oldest first, as a view of the storage
+        end = self.head + self.capacity
+        return self.data[:, end - self.count:end]
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
@@ -0,0 +1,190 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Headless set-point scenarios for the continuous time microgrid
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+# Usage:
+#   python simba_scenario.py day.csv -o results/day --record-every 1000
+# CSV: a time column (seconds or HH:MM:SS) then one column per variable, empty cells keep the value:
+#   time,SP_Train,SP_H2,SP_dtc_UPS
+#   0,0,0,0
+#   06:12:00,250,,
+#   06:14:30,0,,
+#   07:00:00,,50,
+# YAML (needs PyYAML): a list of entries, or {events: [...]}:
+#   - {time: "06:12:00", SP_Train: 250}
+#   - {time: "07:00:00", SP_H2: 50, SP_res_Batt: -100}
+# A ramp is written as successive rows.
+
+#%%  Load required module
+import argparse
+import csv
+import os, pathlib
+import time
+import numpy as np
+from simba_overrides import DesignTemplate, format_value
+from simba_signals import extract_columns
+from simba_store import ResultWriter
+
+DESIGN_NAME = "7 DCMicrogrid - CT"
+
+#%%  DECLARE FUNCTIONS
+
+def parse_time(value):
+    # Seconds as a number, or HH:MM:SS[.fff] / MM:SS
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in str(value).strip().split(":"):
+        seconds = 60.0 * seconds + float(part)
+    return seconds
+
+def merge_events(entries):
+    # [(time, {name: value}), ...] -> sorted, one entry per time, later rows win
+    merged = {}
+    for time_point, values in entries:
+        merged.setdefault(time_point, {}).update(values)
+    return sorted(merged.items())
+
+def load_csv(path):
+    with open(path, "r", newline="") as f:
+        rows = list(csv.reader(row for row in f if row.strip() and not row.lstrip().startswith("#")))
+    header = [name.strip() for name in rows[0]]
+    if header[0].lower() != "time":
+        raise ValueError(path + ": the first column must be 'time'")
+    entries = []
+    for row in rows[1:]:
+        values = {name: cell.strip() for name, cell in zip(header[1:], row[1:]) if cell.strip()}
+        entries.append((parse_time(row[0]), values))
+    return entries
+
+def load_yaml(path):
+    try:
+        import yaml
+    except ImportError:
+        raise ImportError("YAML scenarios need PyYAML (pip install pyyaml), or use a CSV scenario")
+    with open(path, "r") as f:
+        content = yaml.safe_load(f)
+    if isinstance(content, dict):
+        content = content.get("events", [])
+    entries = []
+    for entry in content:
+        values = dict(entry)
+        entries.append((parse_time(values.pop("time")), values))
+    return entries
+
+def load_scenario(path):
+    """Time-stamped set-points of a CSV or YAML file, as a sorted list of (time, {variable: value})."""
+    if path.endswith((".yaml", ".yml")):
+        return merge_events(load_yaml(path))
+    return merge_events(load_csv(path))
+
+def run_scenario(filepath, events, end_time=None, signal_names=None, output=None, design_name=DESIGN_NAME,
+                 base_points=1000, max_points=100000, record_every=1):
+    """Run the continuous time design headless through a set-point schedule.
+
+    Every set-point change is validated against the design first (see
+    DesignTemplate) and snapped on the time step. The job advances in
+    chunks that end on the next event (at most max_points samples), the
+    changes are applied between two chunks, so exactly at their sample,
+    and the loop runs as fast as the solver allows. If the job keeps the
+    chunk size it was created with (base_points), events are applied at
+    the first boundary after them and the delay is reported. With output,
+    every record_every-th sample is written to a result store (simba_store).
+    Returns a summary: simulated and wall time, chunks and applied events.
+    """
+    from simba_sweep import open_design, designs, set_variables
+    from simba_telemetry import SIGNAL_NAMES
+    signal_names = list(signal_names or SIGNAL_NAMES)
+    template = DesignTemplate(filepath, design_name)
+    design = open_design(filepath, design_name)
+    variables = designs[(filepath, design_name)][1]
+    analysis = design.TransientAnalysis
+    dt = float(analysis.TimeStep)
+    schedule = [(int(round(time_point / dt)), template.validate(values)) for time_point, values in events]
+    end_time = end_time if end_time is not None else (events[-1][0] if events else 0.0) + 1.0
+    end_sample = int(round(end_time / dt))
+
+    writer = None
+    if output:
+        metadata = {"file": os.path.basename(filepath), "design": design_name, "time_step": dt,
+                    "record_every": record_every,
+                    "events": [[sample * dt, {name: format_value(value) for name, value in values.items()}]
+                               for sample, values in schedule]}
+        writer = ResultWriter(output, signal_names, metadata)
+
+    previous = {name: variable.Value for name, variable in variables.items()}
+    previous_points = analysis.NumberOfPointsToSimulate
+    analysis.NumberOfPointsToSimulate = base_points
+    summary = {"chunks": 0, "applied": [], "max_delay": 0.0, "adaptive": True}
+    position, pending = 0, 0
+    try:
+        job = analysis.NewJob()
+        start = time.perf_counter()
+        print("-> Scenario of " + str(len(schedule)) + " events up to t = " + str(end_time) + " s")
+        while True:
+            # changes due at the current sample, applied before the next chunk
+            while pending < len(schedule) and schedule[pending][0] <= position:
+                sample, values = schedule[pending]
+                set_variables(design, {name: format_value(value) for name, value in values.items()}, variables)
+                delay = (position - sample) * dt
+                summary["applied"].append((sample * dt, position * dt, values))
+                summary["max_delay"] = max(summary["max_delay"], delay)
+                print("-> t = " + "%.6f" % (position * dt) + " s: " + str(values))
+                pending += 1
+            if position >= end_sample:
+                break
+            target = min(end_sample, position + max_points)
+            if pending < len(schedule):
+                target = min(target, schedule[pending][0])
+            if summary["adaptive"]:
+                analysis.NumberOfPointsToSimulate = max(target - position, 1)
+            status = job.Run()
+            t, data, index = extract_columns(job, signal_names)
+            job.ClearScopesData()
+            if len(t) == 0:
+                print("-> Job stopped at t = " + str(position * dt) + " s")
+                break
+            # check the position reached, not the number of samples: the first chunk also holds the t = 0
+            # sample (SaveInitialPoint), whether or not it counts in NumberOfPointsToSimulate
+            reached = int(round(t[-1] / dt))
+            expected = max(target, position + 1)
+            if summary["adaptive"] and reached != expected and not (summary["chunks"] == 0 and reached == expected - 1):
+                summary["adaptive"] = False
+                print("-> The job keeps chunks of " + str(len(t)) + " points, events are applied at the next boundary")
+            position = reached
+            summary["chunks"] += 1
+            if writer is not None:
+                samples = np.rint(t / dt).astype(np.int64)
+                keep = np.flatnonzero((samples % record_every == 0) & (samples <= end_sample))
+                writer.append(t[keep], data[keep])
+        wall = time.perf_counter() - start
+    finally:
+        analysis.NumberOfPointsToSimulate = previous_points
+        set_variables(design, previous, variables)
+        if writer is not None:
+            writer.close()
+    simulated = min(position, end_sample) * dt
+    summary.update({"simulated_s": simulated, "wall_s": wall, "speed": simulated / wall if wall else 0.0})
+    print("-> Scenario Done: " + "%.3f" % summary["simulated_s"] + " s simulated in " + "%.1f" % wall + " s (x" +
+          "%.3g" % summary["speed"] + " real time), " + str(summary["chunks"]) + " chunks, " +
+          str(len(summary["applied"])) + " events, max delay " + str(summary["max_delay"]) + " s")
+    return summary
+
+#%%  Replay a scenario file as a batch job
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless set-point scenario of the continuous time microgrid")
+    parser.add_argument("scenario", help="CSV or YAML set-point profile")
+    parser.add_argument("--file", default=os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba"))
+    parser.add_argument("--end-time", type=parse_time, help="default: 1 s after the last event")
+    parser.add_argument("-o", "--output", help="result store directory")
+    parser.add_argument("--signal", action="append", help="recorded signal (repeatable, default: the Run_7 channels)")
+    parser.add_argument("--base-points", type=int, default=1000, help="chunk size the job is created with")
+    parser.add_argument("--max-points", type=int, default=100000, help="largest chunk between two events")
+    parser.add_argument("--record-every", type=int, default=1, help="keep one sample out of n in the output")
+    args = parser.parse_args()
+
+    events = load_scenario(args.scenario)
+    run_scenario(args.file, events, args.end_time, args.signal, args.output,
+                 base_points=args.base_points, max_points=args.max_points, record_every=args.record_every)
@@ -0,0 +1,88 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Bulk columnar extraction of job signals
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from aesim.simba import Design, JsonProjectRepository
+import os, pathlib
+import sys
+import time
+import tracemalloc
+import numpy as np
+from simba_index import ProjectIndex
+
+# .NET arrays (DataPoints) are copied straight into the numpy buffer when pythonnet is available
+try:
+    from System import IntPtr
+    from System.Runtime.InteropServices import Marshal
+except ImportError:
+    Marshal = None
+
+#%%  DECLARE FUNCTIONS
+
+def copy_points(column, points):
+    # Copy a DataPoints sequence into a contiguous float64 column without an intermediate list
+    if Marshal is not None and hasattr(points, "Length") and points.Length == len(column):
+        Marshal.Copy(points, 0, IntPtr(column.ctypes.data), len(column))
+    else:
+        column[:] = np.fromiter(points, dtype=float, count=len(column))
+
+def extract_columns(job, signal_names=None, filepath=None, design_name=None):
+    """Extract many signals of a finished job into one preallocated array.
+
+    Returns t, data and index where data has shape (time x signal) and
+    index maps a signal name to its column. Without signal_names all enabled
+    scopes of design_name (read from the project file) are extracted. The array
+    is Fortran ordered so every column is contiguous and filled in place.
+    """
+    if signal_names is None:
+        signal_names = ProjectIndex(filepath).signals(design_name)
+    t = np.fromiter(job.TimePoints, dtype=float)
+    data = np.empty((len(t), len(signal_names)), order="F")
+    index = {}
+    for k, name in enumerate(signal_names):
+        copy_points(data[:, k], job.GetSignalByName(name).DataPoints)
+        index[name] = k
+    return t, data, index
+
+def measure_extraction(job, signal_names):
+    # Extraction time and peak memory of the per-signal np.array pattern against extract_columns
+    report = {}
+    tracemalloc.start()
+    start = time.perf_counter()
+    signals = [np.array(job.GetSignalByName(name).DataPoints) for name in signal_names]
+    report["per_signal_s"] = time.perf_counter() - start
+    report["per_signal_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    del signals
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    t, data, index = extract_columns(job, signal_names)
+    report["columns_s"] = time.perf_counter() - start
+    report["columns_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    report["result_bytes"] = data.nbytes
+    del data
+    tracemalloc.stop()
+    return report
+
+#%%  Compare both extraction patterns on models 4 and 6, optional argument: EndTime
+if __name__ == "__main__":
+    filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
+    project = JsonProjectRepository(filepath)
+    index = ProjectIndex(filepath)
+    for design_name in ["4 MultiCell IPOS SST", "6 DCMicrogrid"]:
+        sst_model = project.GetDesignByName(design_name)
+        if len(sys.argv) > 1:
+            sst_model.TransientAnalysis.EndTime = float(sys.argv[1])
+        print("loading model: " + sst_model.Name)
+        job = sst_model.TransientAnalysis.NewJob()
+        print("-> Job Started ")
+        status = job.Run()
+        signal_names = index.signals(design_name)
+        print("-> Extracting " + str(len(signal_names)) + " scopes")
+        report = measure_extraction(job, signal_names)
+        for name, value in report.items():
+            print(name + "\t " + str(value))
@@ -0,0 +1,86 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Steady-state detection and early termination of transient jobs
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from aesim.simba import Design, JsonProjectRepository
+import os, pathlib
+import numpy as np
+from simba_signals import extract_columns
+
+#%%  DECLARE FUNCTIONS
+
+def window_criteria(tail, n_window, ripple_tol, drift_tol):
+    """Steady-state test on the last two windows of the watched signals.
+
+    tail is a (time x signal) array holding at least 2*n_window samples.
+    The peak-to-peak ripple of the last window and the drift between the
+    means of the last two windows are compared with the tolerances (scalars
+    or one value per signal). Returns (steady, ripple, drift).
+    """
+    last = tail[-n_window:]
+    previous = tail[-2 * n_window:-n_window]
+    ripple = np.ptp(last, axis=0)
+    drift = np.abs(last.mean(axis=0) - previous.mean(axis=0))
+    steady = bool(np.all(ripple <= ripple_tol) and np.all(drift <= drift_tol))
+    return steady, ripple, drift
+
+def switching_frequency(design):
+    variables = {variable.Name: variable.Value for variable in design.Circuit.Variables}
+    if "F_SW" not in variables:
+        raise KeyError("variable F_SW not found in design " + design.Name)
+    return float(variables["F_SW"])
+
+def run_to_steady_state(design, signal_names, watch_names, ripple_tol, drift_tol, n_periods=10, min_time=0.0,
+                        chunk_points=None):
+    """Advance a transient job chunk by chunk and stop it once the watched signals settle.
+
+    The windows span n_periods switching periods at F_SW, so the means are
+    free of switching ripple. The test only starts after min_time (e.g. the
+    last load step of the design). Returns t, data (time x signal), index
+    and whether steady state was reached before EndTime.
+    """
+    analysis = design.TransientAnalysis
+    end_time = float(analysis.EndTime)
+    n_window = max(1, int(round(n_periods / (switching_frequency(design) * float(analysis.TimeStep)))))
+    names = list(signal_names) + [name for name in watch_names if name not in signal_names]
+    watch = [names.index(name) for name in watch_names]
+
+    previous_points = analysis.NumberOfPointsToSimulate
+    analysis.NumberOfPointsToSimulate = chunk_points or n_window
+    try:
+        job = analysis.NewJob()
+    finally:
+        analysis.NumberOfPointsToSimulate = previous_points
+
+    chunks = []
+    tail = np.empty((0, len(watch)))
+    steady = False
+    print("-> Job Started, steady state over " + str(n_periods) + " periods")
+    while True:
+        status = job.Run()
+        t, data, index = extract_columns(job, names)
+        job.ClearScopesData()
+        if len(t) == 0:
+            break
+        keep = int(np.searchsorted(t, end_time, side="right"))
+        chunks.append((t[:keep], data[:keep]))
+        tail = np.concatenate((tail, data[:keep, watch]))[-2 * n_window:]
+        if keep and t[keep - 1] >= min_time and len(tail) == 2 * n_window:
+            steady = window_criteria(tail, n_window, ripple_tol, drift_tol)[0]
+        if steady or keep < len(t) or t[-1] >= end_time:
+            break
+
+    n_points = sum(len(t) for t, data in chunks)
+    t = np.empty(n_points)
+    data = np.empty((n_points, len(names)), order="F")
+    start = 0
+    for t_chunk, data_chunk in chunks:
+        t[start:start + len(t_chunk)] = t_chunk
+        data[start:start + len(t_chunk)] = data_chunk
+        start += len(t_chunk)
+    if steady:
+        print("-> Steady state at t = " + str(t[-1]) + " s, EndTime " + str(end_time) + " s")
+    return t, data, {name: k for k, name in enumerate(names)}, steady
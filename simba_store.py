@@ -0,0 +1,154 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Chunked, compressed result store with run metadata
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import os, pathlib
+import bisect
+import json
+import zlib
+import numpy as np
+
+STORE_VERSION = 1
+
+#%%  DECLARE FUNCTIONS
+
+def column_file(directory, k):
+    # Column 0 is the time vector, column k + 1 the signal k
+    return os.path.join(directory, "t.col" if k == 0 else "signal_" + str(k - 1) + ".col")
+
+def write_result(directory, t, signal_names, signals, metadata=None, chunk_points=65536, compress=True):
+    # Store a finished run, signals is a sequence of columns or a (time x signal) array
+    writer = ResultWriter(directory, signal_names, metadata, chunk_points, compress)
+    data = signals if isinstance(signals, np.ndarray) and signals.ndim == 2 else np.column_stack(signals)
+    writer.append(t, data)
+    writer.close()
+    return ResultStore(directory)
+
+#%%  DECLARE CLASSES
+
+class ResultWriter:
+    """Write a run as one file per column, in chunks of chunk_points samples.
+
+    Every chunk is zlib compressed on its own (or written raw with
+    compress=False, which keeps the columns memory-mappable). meta.json holds
+    the signal names, the run metadata (design, variables, analysis
+    settings...), the byte span of every chunk and the time range of every
+    chunk. append() accepts windows of any length, e.g. from a streaming run.
+    """
+
+    def __init__(self, directory, signal_names, metadata=None, chunk_points=65536, compress=True):
+        self.directory = directory
+        self.signal_names = list(signal_names)
+        self.metadata = dict(metadata or {})
+        self.chunk_points = chunk_points
+        self.compress = compress
+        self.pending = []
+        self.pending_points = 0
+        self.n_points = 0
+        self.chunks = []        # [time of first sample, time of last sample, first sample index]
+        self.spans = [[] for k in range(len(self.signal_names) + 1)]
+        os.makedirs(directory, exist_ok=True)
+        self.files = [open(column_file(directory, k), "wb") for k in range(len(self.signal_names) + 1)]
+
+    def append(self, t, data):
+        # t (n,) and data (n x signals) of the next samples
+        block = np.empty((len(t), len(self.signal_names) + 1))
+        block[:, 0] = t
+        block[:, 1:] = data
+        self.pending.append(block)
+        self.pending_points += len(t)
+        while self.pending_points >= self.chunk_points:
+            self.flush(self.chunk_points)
+
+    def flush(self, n):
+        block = np.concatenate(self.pending) if len(self.pending) > 1 else self.pending[0]
+        chunk, rest = block[:n], block[n:]
+        self.pending = [rest] if len(rest) else []
+        self.pending_points = len(rest)
+        self.chunks.append([float(chunk[0, 0]), float(chunk[-1, 0]), self.n_points])
+        self.n_points += len(chunk)
+        for k, f in enumerate(self.files):
+            raw = np.ascontiguousarray(chunk[:, k]).tobytes()
+            payload = zlib.compress(raw, 1) if self.compress else raw
+            self.spans[k].append([f.tell(), len(payload)])
+            f.write(payload)
+
+    def close(self):
+        if self.pending_points:
+            self.flush(self.pending_points)
+        for f in self.files:
+            f.close()
+        meta = {"version": STORE_VERSION, "signals": self.signal_names, "points": self.n_points,
+                "chunk_points": self.chunk_points, "compression": "zlib" if self.compress else None,
+                "chunks": self.chunks, "spans": self.spans, "metadata": self.metadata}
+        tmp = os.path.join(self.directory, "meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(self.directory, "meta.json"))
+
+class ResultStore:
+    """Reader of a stored run, loading only the chunks a request touches.
+
+    read(name, start_time, end_time) locates the chunks from the per-chunk
+    time ranges kept in meta.json and decompresses those only. Uncompressed
+    stores also expose every column as np.memmap through column().
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            self.meta = json.load(f)
+        self.signal_names = self.meta["signals"]
+        self.index = {name: k + 1 for k, name in enumerate(self.signal_names)}
+        self.metadata = self.meta["metadata"]
+        self.n_points = self.meta["points"]
+        self.chunk_starts = [chunk[0] for chunk in self.meta["chunks"]]
+
+    def column_index(self, name):
+        if name == "t":
+            return 0
+        if name not in self.index:
+            raise KeyError("signal " + name + " not found in " + self.directory)
+        return self.index[name]
+
+    def column(self, name):
+        # Whole column, memory-mapped when the store is uncompressed
+        k = self.column_index(name)
+        if self.meta["compression"] is None:
+            return np.memmap(column_file(self.directory, k), dtype=np.float64, mode="r", shape=(self.n_points,))
+        return self.read_chunks(k, 0, len(self.meta["chunks"]))
+
+    def read_chunks(self, k, first, last):
+        # Decoded samples of chunks [first, last) of column k
+        spans = self.meta["spans"][k][first:last]
+        if not spans:
+            return np.empty(0)
+        with open(column_file(self.directory, k), "rb") as f:
+            f.seek(spans[0][0])
+            raw = f.read(spans[-1][0] + spans[-1][1] - spans[0][0])
+        if self.meta["compression"] is None:
+            return np.frombuffer(raw, dtype=np.float64)
+        base = spans[0][0]
+        return np.concatenate([np.frombuffer(zlib.decompress(raw[offset - base:offset - base + length]),
+                                             dtype=np.float64) for offset, length in spans])
+
+    def read(self, name, start_time=None, end_time=None):
+        """t and the samples of one signal with start_time <= t <= end_time."""
+        k = self.column_index(name)
+        n_chunks = len(self.meta["chunks"])
+        first = 0 if start_time is None else max(bisect.bisect_right(self.chunk_starts, start_time) - 1, 0)
+        last = n_chunks if end_time is None else bisect.bisect_right(self.chunk_starts, end_time)
+        t = self.read_chunks(0, first, last)
+        lo = 0 if start_time is None else int(np.searchsorted(t, start_time, side="left"))
+        hi = len(t) if end_time is None else int(np.searchsorted(t, end_time, side="right"))
+        if k == 0:
+            return t[lo:hi], t[lo:hi]
+        return t[lo:hi], self.read_chunks(k, first, last)[lo:hi]
+
+    def read_tail(self, name, duration):
+        # Last duration seconds of one signal
+        end = self.meta["chunks"][-1][1] if self.meta["chunks"] else 0.0
+        return self.read(name, end - duration, None)
@@ -0,0 +1,104 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Chunked streaming of long transient runs to memory-mapped files
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import os, pathlib
+import json
+import numpy as np
+from simba_signals import extract_columns
+
+#%%  DECLARE FUNCTIONS
+
+def stream_files(directory, n_signals):
+    # Raw float64 files of a stream: time vector first, then one file per signal
+    return [os.path.join(directory, "t.f64")] + \
+           [os.path.join(directory, "signal_" + str(k) + ".f64") for k in range(n_signals)]
+
+def write_meta(directory, signal_names, n_points, end_time):
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"signals": list(signal_names), "points": n_points, "end_time": end_time}, f)
+
+def append_window(files, t, data):
+    # Append one window, every column of data is contiguous and written as is
+    with open(files[0], "ab") as f:
+        t.tofile(f)
+    for k in range(data.shape[1]):
+        with open(files[k + 1], "ab") as f:
+            data[:, k].tofile(f)
+
+def run_streaming(design, signal_names, directory, window_points=100000):
+    """Advance a transient job window by window and stream the results to disk.
+
+    Works like the continuous time script: NumberOfPointsToSimulate sets the
+    window, the window is appended to one raw file per signal and the scopes
+    are cleared before the next Run(). Peak memory is set by window_points,
+    not by EndTime. Returns the results as np.memmap (see open_streamed).
+    """
+    analysis = design.TransientAnalysis
+    end_time = float(analysis.EndTime)
+    analysis.NumberOfPointsToSimulate = window_points
+    job = analysis.NewJob()
+
+    os.makedirs(directory, exist_ok=True)
+    files = stream_files(directory, len(signal_names))
+    for path in files:
+        open(path, "wb").close()
+
+    n_points = 0
+    write_meta(directory, signal_names, n_points, 0.0)
+    print("-> Streaming Job Started ")
+    while True:
+        status = job.Run()
+        t, data, index = extract_columns(job, signal_names)
+        job.ClearScopesData()
+        if len(t) == 0:
+            break
+        keep = int(np.searchsorted(t, end_time, side="right"))
+        append_window(files, t[:keep], data[:keep])
+        n_points += keep
+        write_meta(directory, signal_names, n_points, float(t[keep - 1]) if keep else end_time)
+        print("-> t = " + str(t[-1]) + " s")
+        if keep < len(t) or t[-1] >= end_time:
+            break
+    print("-> Streaming Job Done ")
+    return open_streamed(directory)
+
+def open_streamed(directory):
+    # Open a streamed run, returns t and a dict signal name -> np.memmap
+    with open(os.path.join(directory, "meta.json"), "r") as f:
+        meta = json.load(f)
+    files = stream_files(directory, len(meta["signals"]))
+    n_points = meta["points"]
+    t = np.memmap(files[0], dtype=np.float64, mode="r", shape=(n_points,))
+    signals = {name: np.memmap(files[k + 1], dtype=np.float64, mode="r", shape=(n_points,))
+               for k, name in enumerate(meta["signals"])}
+    return t, signals
+
+def decimate_minmax(t, Y, points):
+    """Min/max decimation of (channels x n) samples to at most points samples per channel.
+
+    The window is cut into points // 2 buckets (the oldest n % buckets
+    samples are dropped), every bucket gives its min and max in the order
+    they occur, at the times of the bucket's first and last samples, so
+    peaks survive any resolution.
+    """
+    n = Y.shape[1]
+    buckets = points // 2
+    if n <= points or buckets < 1:
+        return t, Y
+    width = n // buckets
+    start = n - buckets * width
+    blocks = Y[:, start:].reshape(Y.shape[0], buckets, width)
+    low, high = blocks.argmin(axis=2), blocks.argmax(axis=2)
+    y_low = np.take_along_axis(blocks, low[:, :, None], axis=2)[:, :, 0]
+    y_high = np.take_along_axis(blocks, high[:, :, None], axis=2)[:, :, 0]
+    low_first = low <= high
+    out = np.empty((Y.shape[0], buckets, 2), dtype=Y.dtype)
+    out[:, :, 0] = np.where(low_first, y_low, y_high)
+    out[:, :, 1] = np.where(low_first, y_high, y_low)
+    t_blocks = t[start:].reshape(buckets, width)
+    t_out = np.column_stack((t_blocks[:, 0], t_blocks[:, -1])).ravel()
+    return t_out, out.reshape(Y.shape[0], 2 * buckets)
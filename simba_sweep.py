@@ -0,0 +1,134 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Parallel parameter sweep runner for the jsimba designs
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os, pathlib
+from simba_cache import ResultCache, cache_key
+from simba_signals import extract_columns
+from simba_index import ProjectIndex
+from simba_steady import run_to_steady_state
+from simba_trace import open_project
+from simba_timestep import apply_fast_mode
+from simba_overrides import DesignTemplate
+
+#%%  Projects and designs already opened by this process (one per worker)
+projects = {}
+designs = {}
+
+#%%  DECLARE FUNCTIONS
+
+def open_design(filepath, design_name):
+    # Open the project and the design once per process (at the fast mode step with SIMBA_FAST=1)
+    if (filepath, design_name) not in designs:
+        project = projects.get(filepath)
+        if project is None:
+            project = open_project(filepath)
+            projects[filepath] = project
+        design = project.GetDesignByName(design_name)
+        apply_fast_mode(filepath, design)
+        designs[(filepath, design_name)] = (design, {variable.Name: variable for variable in design.Circuit.Variables})
+    return designs[(filepath, design_name)][0]
+
+def set_variables(design, values, variables=None):
+    # Assign variable values, return the previous values so they can be restored
+    # Every name is checked before the first assignment, so a bad name leaves the design untouched
+    if variables is None:
+        variables = {variable.Name: variable for variable in design.Circuit.Variables}
+    for name in values:
+        if name not in variables:
+            raise KeyError("variable " + name + " not found in design " + design.Name)
+    previous = {}
+    for name, value in values.items():
+        previous[name] = variables[name].Value
+        variables[name].Value = str(value)
+    return previous
+
+def analysis_settings(design):
+    # Transient analysis settings that change the results of a job
+    analysis = design.TransientAnalysis
+    return {"EndTime": analysis.EndTime, "TimeStep": analysis.TimeStep}
+
+def run_design(filepath, design, signal_names, cache=None, steady_state=None):
+    # Run a job on an opened design, or reuse the cached results of an identical run
+    # steady_state: keyword arguments of run_to_steady_state, the job then stops once settled
+    if cache is not None:
+        values = {variable.Name: variable.Value for variable in design.Circuit.Variables}
+        analysis = analysis_settings(design)
+        if steady_state:
+            analysis["SteadyState"] = repr(sorted(steady_state.items()))
+        key = cache_key(filepath, design.Name, values, analysis)
+        cached = cache.get(key, signal_names)
+        if cached is not None:
+            print("-> Job results loaded from cache ")
+            return cached
+    if steady_state:
+        t, data, index, steady = run_to_steady_state(design, signal_names, **steady_state)
+        data = data[:, :len(signal_names)]
+    else:
+        job = design.TransientAnalysis.NewJob()
+        print("-> Job Started ")
+        status = job.Run()
+        t, data, index = extract_columns(job, signal_names)
+    if cache is not None:
+        cache.put(key, t, signal_names, data.T)
+    return t, [data[:, k] for k in range(len(signal_names))]
+
+def run_point(filepath, design_name, values, signal_names, cache_dir=None, steady_state=None):
+    # Run one sweep point, the design is restored afterwards so the next point starts clean
+    design = open_design(filepath, design_name)
+    variables = designs[(filepath, design_name)][1]
+    cache = ResultCache(cache_dir) if cache_dir else None
+    previous = set_variables(design, values, variables)
+    try:
+        t, signals = run_design(filepath, design, signal_names, cache, steady_state)
+    finally:
+        set_variables(design, previous, variables)
+    return t, signals
+
+def run_config(config, signal_names, cache_dir=None, steady_state=None):
+    # Run one RunConfig of simba_overrides.DesignTemplate in this worker
+    return run_point(config.filepath, config.design_name, config.values(), signal_names, cache_dir, steady_state)
+
+def run_sweep(filepath, design_name, variable_name, sweep_values, signal_names, fixed_values=None, processes=None,
+              cache_dir=None, steady_state=None):
+    """Run one job per sweep value over a pool of worker processes.
+
+    Every worker opens its own JsonProjectRepository and design. Returns the
+    time vectors and a dict signal name -> list of arrays, both in sweep order.
+    With cache_dir set, points already simulated are read from the ResultCache.
+    With steady_state set (keyword arguments of run_to_steady_state), every
+    point stops once settled and the simulated time saved is reported.
+    """
+    fixed_values = dict(fixed_values or {})
+    points = []
+    for value in sweep_values:
+        values = dict(fixed_values)
+        values[variable_name] = value
+        points.append(values)
+    # every point is validated against the design variables before the pool starts
+    configs = DesignTemplate(filepath, design_name).configure_many(points)
+
+    processes = max(1, min(processes or os.cpu_count() or 1, len(points)))  # an empty sweep still opens a valid pool
+    print("-> Sweep " + variable_name + " on " + str(len(points)) + " points, " + str(processes) + " processes")
+    # spawn: forking a process that already hosts the Simba runtime is not safe
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        results = list(executor.map(run_config,
+                                    configs,
+                                    [signal_names] * len(points),
+                                    [cache_dir] * len(points),
+                                    [steady_state] * len(points)))
+
+    t_arr = [t for t, signals in results]
+    signal_arr = {name: [signals[k] for t, signals in results] for k, name in enumerate(signal_names)}
+    if steady_state:
+        end_time = float(ProjectIndex(filepath).analysis(design_name)["EndTime"])
+        saved = sum(end_time - float(t[-1]) for t in t_arr)
+        print("-> Steady state: " + str(saved) + " s of " + str(end_time * len(t_arr)) + " s simulated time saved")
+    print("-> Sweep Done")
+    return t_arr, signal_arr
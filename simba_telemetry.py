@@ -0,0 +1,255 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Headless continuous time run of the microgrid with a local telemetry server
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+# Usage:
+#   python simba_telemetry.py --port 8765
+# Endpoints (localhost only by default):
+#   GET  /signals                  channel names and setpoint variables (JSON)
+#   GET  /frame?points=2000        latest window as one binary frame (application/octet-stream)
+#   GET  /stream?points=2000       server-sent events, one base64 binary frame per update
+#   POST /set  {"SP_H2": 100}      setpoints, applied between two chunks as in Run_7
+# Frame: header <4sHIdd> = b"SIMB", channels, points, t_first, t_last, then t as float64 and
+# one float32 block per channel. Above 'points' samples, every channel is min/max decimated.
+
+#%%  Load required module
+import argparse
+import base64
+import json
+import os, pathlib
+import struct
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+from simba_overrides import DesignTemplate
+from simba_ringbuffer import RingBuffer
+from simba_stream import decimate_minmax
+
+FRAME_MAGIC = b"SIMB"
+FRAME_HEADER = struct.Struct("<4sHIdd")
+
+# Channels of the Run_7 display
+SIGNAL_NAMES = ['Sc6:V_AFE - Instantaneous Voltage',
+                'Sc6:I_AFE - Instantaneous Current',
+                'Sc6:I_PFE1 - Instantaneous Current',
+                'Sc6:I_PFE2 - Instantaneous Current',
+                'Sc6:I_PFE3 - Instantaneous Current',
+                'Sc6:I_PFE4 - Instantaneous Current',
+                'Sc6:I_PFE5 - Instantaneous Current',
+                'Sc19:PCC - Out',
+                'Sc19:I_AFE - Instantaneous Current',
+                'Sc19:I_PFE1 - Instantaneous Current',
+                'Sc19:I_PFE2 - Instantaneous Current',
+                'Sc19:I_PFE3 - Instantaneous Current',
+                'Sc5:PCC - Out',
+                'Sc5:I_AFE - Instantaneous Current',
+                'Sc5:I_PFE1 - Instantaneous Current',
+                'Sc5:I_PFE2 - Instantaneous Current',
+                'Sc5:I_PFE3 - Instantaneous Current']
+SETPOINTS = ["SP_H2", "SP_dtc_UPS", "SP_res_Batt"]
+DESIGN_NAME = "7 DCMicrogrid - CT"
+
+#%%  DECLARE FUNCTIONS
+
+def encode_frame(t, Y):
+    # Header, t as float64, then one float32 block per channel
+    t_first, t_last = (float(t[0]), float(t[-1])) if len(t) else (0.0, 0.0)
+    header = FRAME_HEADER.pack(FRAME_MAGIC, Y.shape[0], len(t), t_first, t_last)
+    return header + np.asarray(t, dtype="<f8").tobytes() + np.ascontiguousarray(Y, dtype="<f4").tobytes()
+
+def decode_frame(payload):
+    # Inverse of encode_frame: t (float64) and the (channels x points) float32 array
+    magic, n_channels, n_points, t_first, t_last = FRAME_HEADER.unpack_from(payload)
+    if magic != FRAME_MAGIC:
+        raise ValueError("not a telemetry frame")
+    offset = FRAME_HEADER.size
+    t = np.frombuffer(payload, dtype="<f8", count=n_points, offset=offset)
+    Y = np.frombuffer(payload, dtype="<f4", count=n_channels * n_points, offset=offset + 8 * n_points)
+    return t, Y.reshape(n_channels, n_points)
+
+#%%  DECLARE CLASSES
+
+class TelemetryHub(threading.Thread):
+    """Single consumer of a SimulationWorker, shared by every viewer.
+
+    The hub drains the worker at rate Hz into a RingBuffer (the latest
+    capacity samples, as the Run_7 display), then bumps a version number.
+    Viewers wait for a new version and ask for the frame at their
+    resolution. A frame is decimated and encoded once per resolution and
+    version, whatever the number of viewers, and a slow viewer only skips
+    versions, so viewers never add load to the solver thread. Setpoints
+    posted by viewers are validated against template (a DesignTemplate).
+    """
+
+    def __init__(self, worker, signal_names, template, capacity=45000, rate=25.0):
+        super().__init__(daemon=True)
+        self.worker = worker
+        self.template = template
+        self.signal_names = list(signal_names)
+        self.buffer = RingBuffer(1 + len(self.signal_names), capacity)
+        self.period = 1.0 / rate
+        self.condition = threading.Condition()
+        self.version = 0
+        self.frames = {}
+        self.stop_event = threading.Event()
+        self.error = None
+
+    def run(self):
+        try:
+            while not self.stop_event.wait(self.period):
+                chunks = self.worker.drain()
+                if not chunks:
+                    continue
+                with self.condition:
+                    for t, data in chunks:
+                        self.buffer.write(np.vstack((t, data.T)))
+                    self.version += 1
+                    self.frames = {}
+                    self.condition.notify_all()
+        except Exception as error:
+            self.error = error
+            with self.condition:
+                self.condition.notify_all()
+            raise
+
+    def stop(self):
+        self.stop_event.set()
+        with self.condition:
+            self.condition.notify_all()
+
+    def wait(self, version, timeout=15.0):
+        # Block until the version moves past version (or timeout), returns the current version
+        with self.condition:
+            self.condition.wait_for(lambda: self.version != version or self.stop_event.is_set() or self.error,
+                                    timeout)
+            return self.version
+
+    def frame(self, points):
+        with self.condition:
+            key = (self.version, points)
+            if key not in self.frames:
+                latest = self.buffer.view()
+                t, Y = decimate_minmax(latest[0], latest[1:], points)
+                self.frames[key] = encode_frame(t, Y)
+            return self.frames[key]
+
+class TelemetryHandler(BaseHTTPRequestHandler):
+    hub = None              # set by serve()
+    max_points = 20000
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def points(self, query):
+        try:
+            points = int(query.get("points", ["2000"])[0])
+        except ValueError:
+            points = 2000
+        return max(2, min(points, self.max_points))
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/signals":
+            body = json.dumps({"signals": self.hub.signal_names, "setpoints": SETPOINTS}).encode()
+            self.send_body(200, "application/json", body)
+        elif url.path == "/frame":
+            self.send_body(200, "application/octet-stream", self.hub.frame(self.points(query)))
+        elif url.path == "/stream":
+            self.stream(self.points(query))
+        else:
+            self.send_body(404, "text/plain", b"unknown endpoint")
+
+    def stream(self, points):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        version = -1
+        try:
+            while not self.hub.stop_event.is_set() and self.hub.error is None:
+                current = self.hub.wait(version)
+                if current == version:
+                    self.wfile.write(b": keep-alive\n\n")
+                else:
+                    version = current
+                    payload = base64.b64encode(self.hub.frame(points))
+                    self.wfile.write(b"event: frame\nid: " + str(version).encode() + b"\ndata: " + payload + b"\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/set":
+            self.send_body(404, "text/plain", b"unknown endpoint")
+            return
+        try:
+            values = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not isinstance(values, dict):
+                raise ValueError("expected a JSON object of setpoints")
+            # finite numbers only, as the set-points of simba_scenario
+            values = self.hub.template.validate(values)
+            self.hub.worker.set_values(values)
+        except (ValueError, KeyError, TypeError) as error:
+            message = error.args[0] if isinstance(error, KeyError) and error.args else str(error)
+            self.send_body(400, "text/plain", str(message).encode())
+            return
+        print("-> Setpoints " + str(values))
+        self.send_body(200, "application/json", b"{}")
+
+#%%  DECLARE FUNCTIONS
+
+def serve(hub, host="127.0.0.1", port=8765):
+    TelemetryHandler.hub = hub
+    server = ThreadingHTTPServer((host, port), TelemetryHandler)
+    server.daemon_threads = True
+    return server
+
+def start_simulation(filepath, design_name=DESIGN_NAME, signal_names=None, points_per_run=1000):
+    # Continuous time job of Run_7 in a SimulationWorker thread
+    from simba_sweep import open_design
+    from simba_worker import SimulationWorker
+    design = open_design(filepath, design_name)
+    design.TransientAnalysis.NumberOfPointsToSimulate = points_per_run
+    job = design.TransientAnalysis.NewJob()
+    variables = [variable for variable in design.Circuit.Variables if variable.Name in SETPOINTS]
+    worker = SimulationWorker(job, signal_names or SIGNAL_NAMES, variables)
+    worker.start()
+    return worker
+
+#%%  Headless run of model 7 published on a local server
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless continuous time microgrid run with a telemetry server")
+    parser.add_argument("--file", default=os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--points-per-run", type=int, default=1000, help="samples per Run() of the job")
+    parser.add_argument("--capacity", type=int, default=45000, help="latest samples kept per channel")
+    parser.add_argument("--rate", type=float, default=25.0, help="updates per second")
+    args = parser.parse_args()
+
+    worker = start_simulation(args.file, points_per_run=args.points_per_run)
+    hub = TelemetryHub(worker, SIGNAL_NAMES, DesignTemplate(args.file, DESIGN_NAME), args.capacity, args.rate)
+    hub.start()
+    server = serve(hub, args.host, args.port)
+    print("-> Telemetry on http://" + args.host + ":" + str(args.port) + "/stream?points=2000")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        hub.stop()
+        worker.stop()
+        server.server_close()
@@ -0,0 +1,140 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Time step against accuracy study and fast mode
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+# Usage:
+#   python simba_timestep.py "6 DCMicrogrid" --end-time 0.5 --tolerance 0.01
+# writes the recommended step to <project>.timestep.json, then SIMBA_FAST=1 makes
+# the Run_* scripts and the sweep workers run every design at its recommended step.
+
+#%%  Load required module
+import argparse
+import json
+import os, pathlib
+import time
+import numpy as np
+from simba_index import ProjectIndex
+from simba_signals import extract_columns
+from simba_trace import open_project
+
+DEFAULT_LADDER = [1e-6, 2e-6, 5e-6, 1e-5, 2e-5, 5e-5]
+
+#%%  DECLARE FUNCTIONS
+
+def recommendation_file(filepath):
+    return filepath + ".timestep.json"
+
+def run_at(design, time_step, signal_names):
+    # Run the design at one time step, returns elapsed time, t and data (time x signal)
+    design.TransientAnalysis.TimeStep = time_step
+    job = design.TransientAnalysis.NewJob()
+    start = time.perf_counter()
+    status = job.Run()
+    elapsed = time.perf_counter() - start
+    t, data, index = extract_columns(job, signal_names)
+    return elapsed, t, data
+
+def normalized_error(t_ref, reference, t, data):
+    # RMS error of every signal on the coarse time points, relative to the peak-to-peak of the reference
+    errors = np.empty(reference.shape[1])
+    for k in range(reference.shape[1]):
+        error = data[:, k] - np.interp(t, t_ref, reference[:, k])
+        scale = max(float(np.ptp(reference[:, k])), float(np.max(np.abs(reference[:, k]))) * 1e-3, 1e-12)
+        errors[k] = np.sqrt(np.mean(error ** 2)) / scale
+    return errors
+
+def timestep_study(filepath, design_name, signal_names=None, ladder=None, tolerance=0.01, end_time=None):
+    """Rerun a design on a ladder of time steps and compare with the finest one.
+
+    The first step of the ladder is the reference. For every step the report
+    holds the solver time, the speed-up and the normalized RMS error of the
+    worst signal. The recommended step is the largest one such that it and
+    every finer step stay within tolerance.
+    """
+    ladder = sorted(ladder or DEFAULT_LADDER)
+    index = ProjectIndex(filepath)
+    signal_names = signal_names or index.signals(design_name)
+    design = open_project(filepath).GetDesignByName(design_name)
+    analysis = design.TransientAnalysis
+    previous = (analysis.TimeStep, analysis.EndTime)
+    if end_time is not None:
+        analysis.EndTime = end_time
+    steps = []
+    try:
+        for time_step in ladder:
+            elapsed, t, data = run_at(design, time_step, signal_names)
+            if not steps:
+                t_ref, reference, reference_time = t, data, elapsed
+            errors = normalized_error(t_ref, reference, t, data)
+            worst = int(np.argmax(errors))
+            steps.append({"time_step": time_step, "solver_s": elapsed, "speedup": reference_time / elapsed,
+                          "error": float(errors[worst]), "worst_signal": signal_names[worst]})
+            print("-> TimeStep " + str(time_step) + "\t " + "%.2f" % elapsed + " s\t x" +
+                  "%.1f" % steps[-1]["speedup"] + "\t error " + "%.2e" % errors[worst] + " (" + signal_names[worst] + ")")
+    finally:
+        analysis.TimeStep, analysis.EndTime = previous
+
+    recommended = ladder[0]
+    for step in steps:
+        if step["error"] > tolerance:
+            break
+        recommended = step["time_step"]
+    return {"design": design_name, "sha256": index.index["sha256"], "tolerance": tolerance, "end_time": end_time,
+            "signals": list(signal_names),
+            "steps": steps, "recommended": recommended}
+
+def save_recommendation(filepath, report):
+    path = recommendation_file(filepath)
+    recommendations = {}
+    if os.path.isfile(path):
+        with open(path, "r") as f:
+            recommendations = json.load(f)
+    recommendations[report["design"]] = report
+    with open(path, "w") as f:
+        json.dump(recommendations, f, indent=2)
+
+def recommended_time_step(filepath, design_name):
+    # Recommended step of a design, None when no study was recorded or the project changed since the study
+    path = recommendation_file(filepath)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "r") as f:
+        report = json.load(f).get(design_name)
+    if not report:
+        return None
+    if report.get("sha256") != ProjectIndex(filepath).index["sha256"]:
+        print("-> The time step study of " + design_name + " was run on another version of the project, rerun simba_timestep.py")
+        return None
+    return report["recommended"]
+
+def apply_fast_mode(filepath, design, enabled=None):
+    # Set the recommended step on an opened design, enabled by default when SIMBA_FAST=1
+    if enabled is None:
+        enabled = os.environ.get("SIMBA_FAST") == "1"
+    if not enabled:
+        return None
+    time_step = recommended_time_step(filepath, design.Name)
+    if time_step is None:
+        print("-> Fast mode: no recommended time step for " + design.Name + ", kept " + str(design.TransientAnalysis.TimeStep))
+        return None
+    design.TransientAnalysis.TimeStep = time_step
+    print("-> Fast mode: " + design.Name + " runs at TimeStep " + str(time_step))
+    return time_step
+
+#%%  Run the study on one design and store its recommendation
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time step against accuracy study of a design")
+    parser.add_argument("design")
+    parser.add_argument("--file", default=os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba"))
+    parser.add_argument("--signal", action="append", help="compared signal (repeatable, default: all)")
+    parser.add_argument("--ladder", type=float, nargs="+", help="time steps, the finest is the reference")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="max normalized RMS error")
+    parser.add_argument("--end-time", type=float, help="override EndTime for a shorter study")
+    args = parser.parse_args()
+
+    report = timestep_study(args.file, args.design, args.signal, args.ladder, args.tolerance, args.end_time)
+    save_recommendation(args.file, report)
+    print("-> Recommended TimeStep " + str(report["recommended"]) + " within " + str(args.tolerance) +
+          ", saved to " + recommendation_file(args.file))
@@ -0,0 +1,160 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Instrumentation of the Simba calls: metrics registry and Chrome trace export
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from aesim.simba import Design, JsonProjectRepository
+import atexit
+import contextlib
+import json
+import os, pathlib
+import threading
+import time
+
+# SIMBA_TRACE=1 records metrics, SIMBA_TRACE=<file.json> also writes a Chrome trace at exit
+# (one file per process, loadable in chrome://tracing, Perfetto or speedscope)
+ENABLED = bool(os.environ.get("SIMBA_TRACE"))
+
+# Wrapped methods and properties, with the kind of object they return
+TRACED_CALLS = {"GetDesignByName": "Design", "NewJob": "Job", "Run": None,
+                "GetSignalByName": "Signal", "ClearScopesData": None}
+TRACED_PROPERTIES = {"TransientAnalysis": "Analysis", "TimePoints": None, "DataPoints": None}
+
+#%%  DECLARE CLASSES
+
+class Metrics:
+    """In-process registry of call counts, latencies, sample counts and bytes.
+
+    Thread safe, the continuous time worker records from its own thread.
+    With trace set, every call is also kept as a Chrome trace event.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.events = []
+        self.trace = False
+        self.origin = time.perf_counter()
+
+    def record(self, name, start, duration, samples=0, nbytes=0):
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = {"count": 0, "total_s": 0.0, "max_s": 0.0, "samples": 0, "bytes": 0}
+            stat["count"] += 1
+            stat["total_s"] += duration
+            stat["max_s"] = max(stat["max_s"], duration)
+            stat["samples"] += samples
+            stat["bytes"] += nbytes
+            if self.trace:
+                self.events.append((name, start, duration, threading.get_ident()))
+
+    def totals(self):
+        # Accumulated time per name, used to split a frame or a run by difference
+        with self.lock:
+            return {name: stat["total_s"] for name, stat in self.stats.items()}
+
+    def report(self):
+        with self.lock:
+            print("call\t count\t total [s]\t mean [ms]\t max [ms]\t samples\t bytes")
+            for name, stat in sorted(self.stats.items(), key=lambda item: -item[1]["total_s"]):
+                print(name + "\t " + str(stat["count"]) + "\t " + "%.4f" % stat["total_s"] + "\t " +
+                      "%.3f" % (1e3 * stat["total_s"] / stat["count"]) + "\t " + "%.3f" % (1e3 * stat["max_s"]) +
+                      "\t " + str(stat["samples"]) + "\t " + str(stat["bytes"]))
+
+    def export_chrome_trace(self, path):
+        # Complete events ("ph": "X") in microseconds
+        pid = os.getpid()
+        with self.lock:
+            events = [{"name": name, "ph": "X", "pid": pid, "tid": tid,
+                       "ts": 1e6 * (start - self.origin), "dur": 1e6 * duration}
+                      for name, start, duration, tid in self.events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+class Traced:
+    """Proxy timing the hot Simba calls of the wrapped object, everything else is delegated."""
+
+    __slots__ = ("_target", "_kind")
+
+    def __init__(self, target, kind):
+        object.__setattr__(self, "_target", target)
+        object.__setattr__(self, "_kind", kind)
+
+    def __getattr__(self, name):
+        if name in TRACED_CALLS:
+            return self._wrap_call(name)
+        if name not in TRACED_PROPERTIES:
+            return getattr(self._target, name)
+        start = time.perf_counter()
+        value = getattr(self._target, name)
+        duration = time.perf_counter() - start
+        kind = TRACED_PROPERTIES[name]
+        if kind is not None:
+            return Traced(value, kind)
+        samples = len(value)
+        metrics.record(self._kind + "." + name, start, duration, samples, 8 * samples)
+        return value
+
+    def __setattr__(self, name, value):
+        setattr(self._target, name, value)
+
+    def _wrap_call(self, name):
+        method = getattr(self._target, name)
+        label = self._kind + "." + name
+        kind = TRACED_CALLS[name]
+
+        def call(*args):
+            start = time.perf_counter()
+            result = method(*args)
+            metrics.record(label, start, time.perf_counter() - start)
+            return Traced(result, kind) if kind is not None else result
+        return call
+
+class Span:
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        metrics.record(self.name, self.start, time.perf_counter() - self.start)
+        return False
+
+metrics = Metrics()
+NULL_SPAN = contextlib.nullcontext()
+
+#%%  DECLARE FUNCTIONS
+
+def enable(trace_file=None):
+    # Turn instrumentation on for the objects opened from now on
+    global ENABLED
+    ENABLED = True
+    if trace_file and not metrics.trace:
+        metrics.trace = True
+        root, ext = os.path.splitext(trace_file)
+        atexit.register(metrics.export_chrome_trace, root + "." + str(os.getpid()) + (ext or ".json"))
+
+def open_project(filepath):
+    # JsonProjectRepository, wrapped only when instrumentation is enabled
+    if not ENABLED:
+        return JsonProjectRepository(filepath)
+    start = time.perf_counter()
+    project = JsonProjectRepository(filepath)
+    metrics.record("JsonProjectRepository", start, time.perf_counter() - start)
+    return Traced(project, "Project")
+
+def instrument(obj, kind):
+    # Wrap an already opened project, design or job, returned as is when disabled
+    return Traced(obj, kind) if ENABLED else obj
+
+def span(name):
+    # Time a Python side block (copies, buffer writes), no cost beyond one call when disabled
+    return Span(name) if ENABLED else NULL_SPAN
+
+if ENABLED and os.environ["SIMBA_TRACE"] != "1":
+    enable(os.environ["SIMBA_TRACE"])
@@ -0,0 +1,80 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Adaptive search of controller gains against a step response spec
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os, pathlib
+import numpy as np
+from simba_sweep import run_config
+from simba_overrides import DesignTemplate
+from simba_kpi import step_kpis
+
+#%%  DECLARE FUNCTIONS
+
+def step_metrics(t, y, step_time, end_time, tolerance=0.02):
+    # Overshoot and settling time of one run, see simba_kpi.step_kpis
+    kpis = step_kpis(t, y, step_time, end_time, tolerance=tolerance)
+    return {"overshoot": float(kpis["overshoot"][0]), "settling_time": float(kpis["settling_time"][0])}
+
+def meets_spec(metrics, spec):
+    # Every "max_<metric>" entry of the spec must hold
+    return all(metrics[name[4:]] <= limit for name, limit in spec.items() if name.startswith("max_"))
+
+def evaluate(executor, template, variable_name, gains, signal_name, spec, fixed_values, cache_dir):
+    # Run the candidate gains concurrently, returns one metrics dict per gain
+    configs = template.configure_many([dict(fixed_values, **{variable_name: gain}) for gain in gains])
+    futures = [executor.submit(run_config, config, [signal_name], cache_dir) for config in configs]
+    results = []
+    for future in futures:
+        t, signals = future.result()
+        results.append(step_metrics(t, signals[0], spec["step_time"], spec["end_time"], spec.get("tolerance", 0.02)))
+    return results
+
+def tune_gain(filepath, design_name, variable_name, bounds, signal_name, spec, fixed_values=None, processes=None,
+              rtol=0.05, cache_dir=None):
+    """Find the edge of the gain range meeting a step response spec.
+
+    The spec holds step_time, end_time, an optional band tolerance and limits
+    such as max_overshoot or max_settling_time. Passing gains are assumed to
+    form one side of bounds. Every round evaluates one candidate per process,
+    spaced geometrically inside the current bracket, then keeps the
+    pass/fail pair that brackets the edge. The search stops once the bracket
+    is narrower than rtol. Returns the passing gain on the edge (None when
+    bounds do not bracket the spec) and the list of (gain, metrics) runs.
+    """
+    fixed_values = dict(fixed_values or {})
+    template = DesignTemplate(filepath, design_name)
+    processes = processes or os.cpu_count() or 1
+    history = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        lo, hi = float(bounds[0]), float(bounds[1])
+        gains = list(np.geomspace(lo, hi, max(processes, 2)))
+        while True:
+            for gain, metrics in zip(gains, evaluate(executor, template, variable_name, gains, signal_name,
+                                                     spec, fixed_values, cache_dir)):
+                history.append((float(gain), metrics))
+                print("-> " + variable_name + " = " + str(gain) + "\t " + str(metrics))
+            runs = sorted((gain, meets_spec(metrics, spec)) for gain, metrics in history if lo <= gain <= hi)
+            edges = [(a, b) for a, b in zip(runs, runs[1:]) if a[1] != b[1]]
+            if not edges:
+                print("-> Spec not bracketed by " + variable_name + " in " + str(bounds))
+                return None, history
+            (lo, lo_pass), (hi, hi_pass) = edges[0]
+            if hi / lo <= 1 + rtol:
+                best = lo if lo_pass else hi
+                print("-> Tuned " + variable_name + " = " + str(best) + " in " + str(len(history)) + " runs")
+                return best, history
+            gains = list(np.geomspace(lo, hi, processes + 2)[1:-1])
+
+#%%  Tune KI_I of model 1 on the I_SEC step at 0.05 s
+if __name__ == "__main__":
+    filepath = os.path.join(pathlib.Path().absolute(), "SST_DCMicroGrid_Models.jsimba")
+    spec = {"step_time": 0.05, "end_time": 0.09, "max_overshoot": 0.05}
+    ki, history = tune_gain(filepath, "1 Single SST Current CTRL", "KI_I", (100, 20000),
+                            'Sc1:Sc1:I_SEC - Instantaneous Current', spec,
+                            cache_dir=os.path.join(pathlib.Path().absolute(), ".simba_cache"))
@@ -0,0 +1,85 @@
+#%% System Level Modeling and Simulation of MVDC Microgrids featuring Solid State Transformers
+#%% Tutorial given by Daniel Siemaszko on 5th August at IEEE ICDCM 2024, Columbia SC
+#%% Hands on examples run with Powersys Aesim Simba
+#%% Background simulation thread for the continuous time runs
+#%% https://github.com/PESC-CH/System-level-MVDC-with-SST/
+
+#%%  Load required module
+import threading
+import queue
+from simba_signals import extract_columns
+import simba_trace
+
+#%%  DECLARE CLASSES
+
+class SimulationWorker(threading.Thread):
+    """Keep advancing a continuous time job and queue the result chunks.
+
+    The job must be created with NumberOfPointsToSimulate set. Every chunk
+    (t, data) from extract_columns goes onto a bounded queue, so the worker
+    waits when the consumer falls far behind. Variable updates posted with
+    set_values() are applied between two chunks, never during a Run().
+    """
+
+    def __init__(self, job, signal_names, variables, max_chunks=16):
+        super().__init__(daemon=True)
+        self.job = job
+        self.signal_names = signal_names
+        self.variables = {variable.Name: variable for variable in variables}
+        self.chunks = queue.Queue(maxsize=max_chunks)
+        self.updates = queue.Queue()
+        self.stop_event = threading.Event()
+        self.error = None
+
+    def set_values(self, values):
+        # Thread safe, called from the GUI
+        for name in values:
+            if name not in self.variables:
+                raise KeyError("variable " + name + " is not handled by the simulation worker")
+        self.updates.put(dict(values))
+
+    def apply_updates(self):
+        while True:
+            try:
+                values = self.updates.get_nowait()
+            except queue.Empty:
+                return
+            for name, value in values.items():
+                self.variables[name].Value = str(value)
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                self.apply_updates()
+                status = self.job.Run()
+                with simba_trace.span("Worker.extract"):
+                    t, data, index = extract_columns(self.job, self.signal_names)
+                self.job.ClearScopesData()
+                self.put((t, data))
+        except Exception as error:
+            self.error = error
+            raise
+
+    def put(self, chunk):
+        # Wait for room in the queue but keep watching for stop()
+        while not self.stop_event.is_set():
+            try:
+                self.chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def drain(self):
+        # All chunks produced since the last call, oldest first
+        chunks = []
+        while True:
+            try:
+                chunks.append(self.chunks.get_nowait())
+            except queue.Empty:
+                break
+        if not chunks and self.error is not None:
+            raise RuntimeError("simulation worker stopped") from self.error
+        return chunks
+
+    def stop(self):
+        self.stop_event.set()